@@ -3,9 +3,10 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass, field
+from enum import IntEnum
 from typing import TYPE_CHECKING
 
-from PyQt6.QtCore import QPointF, Qt, QRectF, pyqtSignal, QObject
+from PyQt6.QtCore import QLineF, QPointF, Qt, QRectF, QSize, QTimer, pyqtSignal, QObject
 from PyQt6.QtGui import (
     QBrush, QColor, QFont, QPen, QPainter, QPolygonF,
 )
@@ -24,7 +25,19 @@ if TYPE_CHECKING:
 # Data model
 # ---------------------------------------------------------------------------
 
-@dataclass
+class BalloonStyle(IntEnum):
+    DEFAULT  = 0
+    RED      = 1
+    OUTLINE  = 2
+    NO_ARROW = 3
+
+    @staticmethod
+    def from_name(name: str) -> "BalloonStyle":
+        """Parse a session-file style name, falling back to DEFAULT."""
+        return BalloonStyle.__members__.get(name.upper(), BalloonStyle.DEFAULT)
+
+
+@dataclass(slots=True)
 class BalloonData:
     number: int
     page: int                     # 0-indexed
@@ -32,7 +45,7 @@ class BalloonData:
     balloon_center: QPointF       # PDF coords — centre of the circle
     description: str = ""
     diameter: float = 36.0        # PDF points (controls both on-screen & export size)
-    style: str = "default"        # "default" | "red" | "outline" | "no_arrow"
+    style: BalloonStyle = BalloonStyle.DEFAULT
     font_size_override: float = 0.0  # 0 = auto-size based on radius
     uid: str = field(default_factory=make_uid)
 
@@ -44,7 +57,7 @@ class BalloonData:
             "balloon_center": [self.balloon_center.x(), self.balloon_center.y()],
             "description": self.description,
             "diameter": self.diameter,
-            "style": self.style,
+            "style": self.style.name.lower(),
             "font_size_override": self.font_size_override,
             "uid": self.uid,
         }
@@ -58,7 +71,7 @@ class BalloonData:
             balloon_center=QPointF(*d["balloon_center"]),
             description=d.get("description", ""),
             diameter=d.get("diameter", 36.0),
-            style=d.get("style", "default"),
+            style=BalloonStyle.from_name(d.get("style", "default")),
             font_size_override=d.get("font_size_override", 0.0),
             uid=d["uid"],
         )
@@ -81,6 +94,52 @@ class BalloonSignals(QObject):
 
 ARROW_HEAD_SIZE = 6  # screen pixels
 
+# Balloons no larger than this on screen are cached in item coordinates, so
+# the pixmap survives small zoom changes; bigger ones use a device-coordinate
+# cache.  The item cache is sized at the on-screen scale rounded up to a
+# power of _ITEM_CACHE_STEP: pens are cosmetic (measured in cache pixels),
+# so the downscale to screen thins them by at most that factor.
+_ITEM_CACHE_MAX_PX = 128
+_ITEM_CACHE_STEP = 1.25
+
+
+def _cosmetic_pen(color: QColor, width: int = 2) -> QPen:
+    pen = QPen(color, width)
+    pen.setCosmetic(True)
+    return pen
+
+
+# Paint resources are built once at import and shared by every balloon.
+_LEADER_PEN   = _cosmetic_pen(QColor("red"))
+_LEADER_BRUSH = QBrush(QColor("red"))
+_SELECTED_PEN = _cosmetic_pen(QColor(0x00, 0x78, 0xD7))
+
+# Indexed by BalloonStyle:
+# (circle fill brush or None, circle border pen, text pen, draw leader)
+_STYLE_TABLE: tuple[tuple[QBrush | None, QPen, QPen, bool], ...] = (
+    # DEFAULT
+    (None, _cosmetic_pen(QColor("black")), QPen(QColor("black")), True),
+    # RED
+    (QBrush(QColor("red")), _cosmetic_pen(QColor("black")), QPen(QColor("white")), True),
+    # OUTLINE
+    (None, _cosmetic_pen(QColor("black")), QPen(QColor("black")), True),
+    # NO_ARROW
+    (None, _cosmetic_pen(QColor("red")), QPen(QColor("red")), False),
+)
+
+# Bold label fonts keyed by point size; QFont needs a QGuiApplication, so
+# entries are created lazily on first paint.
+_FONT_CACHE: dict[int, QFont] = {}
+
+
+def _label_font(size: int) -> QFont:
+    font = _FONT_CACHE.get(size)
+    if font is None:
+        font = QFont("Arial", size)
+        font.setBold(True)
+        _FONT_CACHE[size] = font
+    return font
+
 
 class BalloonItem(QGraphicsItem):
     """A self-contained balloon: circle + number label + leader line + arrowhead.
@@ -103,19 +162,43 @@ class BalloonItem(QGraphicsItem):
         self._data = data
         self._page_height = page_height
 
-        # Scene coords (Y-flipped PDF coords)
-        from app.utils import pdf_to_scene
-        sc = pdf_to_scene(data.balloon_center, page_height)
-        st = pdf_to_scene(data.target_point, page_height)
+        # Scene coords (Y-flipped PDF coords); pdf_to_scene inlined, as items
+        # are built in bulk on every page render
+        c, t = data.balloon_center, data.target_point
+        sc = QPointF(c.x(), page_height - c.y())
+        st = QPointF(t.x(), page_height - t.y())
 
         self._scene_center = sc
         self._scene_target = st
 
+        # Geometry caches — cleared by _invalidate_geom_cache()
+        self._bounding_rect_cache: QRectF | None = None
+        self._cached_leader: QLineF | None = None
+        # Arrowhead triangle, rewritten in place; _arrow_visible is False when
+        # the leader is too short to carry one.
+        self._arrow_poly = QPolygonF([QPointF(), QPointF(), QPointF()])
+        self._arrow_visible = False
+        self._cached_circle_rect: QRectF | None = None
+        self._cached_font_size: int = 0
+        # Mirrors isSelected(), kept current by itemChange for paint()
+        self._selected = False
+
+        # Drag moves fire per mouse event; emit `moved` once per event-loop pass.
+        self._last_emitted_pos = QPointF(sc)
+        self._move_coalesce_timer = QTimer(self.signals)
+        self._move_coalesce_timer.setSingleShot(True)
+        self._move_coalesce_timer.setInterval(0)
+        self._move_coalesce_timer.timeout.connect(self._emit_moved)
+
         self.setPos(sc)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, True)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, True)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges, True)
         self.setZValue(10)
+        # Rasterise once and blit on pan/scroll; update() regenerates it.
+        self._view_scale = 1.0
+        self._cache_key: tuple | None = None
+        self._update_cache_mode()
 
     # ------------------------------------------------------------------
     # Properties
@@ -136,6 +219,74 @@ class BalloonItem(QGraphicsItem):
     def set_description(self, desc: str):
         self._data.description = desc
 
+    def set_font_size_override(self, size: float):
+        self._data.font_size_override = size
+        self._invalidate_geom_cache()
+        self.update()
+
+    def set_data(self, data: BalloonData):
+        """Replace the backing data and resync position/target from it."""
+        self.prepareGeometryChange()
+        self._data = data
+        h = self._page_height
+        c, t = data.balloon_center, data.target_point
+        self._scene_target = QPointF(t.x(), h - t.y())
+        self._invalidate_geom_cache()
+        sc = QPointF(c.x(), h - c.y())
+        # The caller already knows about this move; don't echo it back.
+        self._last_emitted_pos = QPointF(sc)
+        self.setPos(sc)
+        self._update_cache_mode()
+        self.update()
+
+    def set_view_scale(self, scale: float):
+        """Tell the item how many device pixels one scene unit covers (view
+        zoom times device pixel ratio) so it can pick a cache mode."""
+        if scale == self._view_scale:
+            return
+        self._view_scale = scale
+        self._update_cache_mode()
+
+    def _update_cache_mode(self):
+        rect = self.boundingRect()
+        longest = max(rect.width(), rect.height(), 1.0)
+        scale = self._view_scale
+        if longest * scale <= _ITEM_CACHE_MAX_PX:
+            k = _ITEM_CACHE_STEP ** math.ceil(math.log(scale, _ITEM_CACHE_STEP))
+            size = QSize(math.ceil(rect.width() * k), math.ceil(rect.height() * k))
+            key = (QGraphicsItem.CacheMode.ItemCoordinateCache, size.width(), size.height())
+        else:
+            size = None
+            key = (QGraphicsItem.CacheMode.DeviceCoordinateCache,)
+        if key == self._cache_key:
+            return
+        self._cache_key = key
+        if size is None:
+            self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        else:
+            self.setCacheMode(QGraphicsItem.CacheMode.ItemCoordinateCache, size)
+
+    def _invalidate_geom_cache(self):
+        """Drop cached geometry; call after pos/target/diameter/font changes."""
+        self._bounding_rect_cache = None
+        self._cached_leader = None
+        self._arrow_visible = False
+        self._cached_circle_rect = None
+
+    def _rebuild_geometry(self):
+        """Recompute circle rect, label size, leader and arrowhead in local coords."""
+        r = self._radius()
+        self._cached_circle_rect = QRectF(-r, -r, 2 * r, 2 * r)
+        if self._data.font_size_override > 0:
+            self._cached_font_size = max(1, int(self._data.font_size_override))
+        else:
+            self._cached_font_size = max(6, int(r * 0.9))
+        if _STYLE_TABLE[self._data.style][3]:
+            origin = QPointF(0, 0)
+            tl = self._target_local()
+            self._cached_leader = QLineF(origin, tl)
+            self._arrow_visible = self._update_arrowhead(origin, tl)
+
     # ------------------------------------------------------------------
     # Bounding rect (in local coords, before scale)
     # ------------------------------------------------------------------
@@ -145,16 +296,21 @@ class BalloonItem(QGraphicsItem):
         return self._data.diameter / 2.0
 
     def boundingRect(self) -> QRectF:
+        if self._bounding_rect_cache is not None:
+            return self._bounding_rect_cache
         r = self._radius()
-        if self._data.style == "no_arrow":
+        if self._data.style == BalloonStyle.NO_ARROW:
             # No leader line — bounding rect is just the circle
-            return QRectF(-r - 2, -r - 2, 2 * r + 4, 2 * r + 4)
-        target_local = self._target_local()
-        min_x = min(-r, target_local.x()) - ARROW_HEAD_SIZE
-        min_y = min(-r, target_local.y()) - ARROW_HEAD_SIZE
-        max_x = max(r, target_local.x()) + ARROW_HEAD_SIZE
-        max_y = max(r, target_local.y()) + ARROW_HEAD_SIZE
-        return QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
+            rect = QRectF(-r - 2, -r - 2, 2 * r + 4, 2 * r + 4)
+        else:
+            target_local = self._target_local()
+            min_x = min(-r, target_local.x()) - ARROW_HEAD_SIZE
+            min_y = min(-r, target_local.y()) - ARROW_HEAD_SIZE
+            max_x = max(r, target_local.x()) + ARROW_HEAD_SIZE
+            max_y = max(r, target_local.y()) + ARROW_HEAD_SIZE
+            rect = QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
+        self._bounding_rect_cache = rect
+        return rect
 
     def _target_local(self) -> QPointF:
         return self._scene_target - self.pos()
@@ -165,108 +321,103 @@ class BalloonItem(QGraphicsItem):
 
     def paint(self, painter: QPainter, option, widget=None):
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        r = self._radius()
-        style = self._data.style
-
-        # Resolve colours and flags by style
-        if style == "red":
-            circle_fill = QColor("red")
-            circle_border = QColor("black")
-            text_color = QColor("white")
-            leader_color = QColor("red")
-            draw_leader = True
-        elif style == "outline":
-            circle_fill = None  # transparent
-            circle_border = QColor("black")
-            text_color = QColor("black")
-            leader_color = QColor("red")
-            draw_leader = True
-        elif style == "no_arrow":
-            circle_fill = None  # transparent
-            circle_border = QColor("red")
-            text_color = QColor("red")
-            leader_color = QColor("red")
-            draw_leader = False
-        else:  # "default"
-            circle_fill = None  # transparent
-            circle_border = QColor("black")
-            text_color = QColor("black")
-            leader_color = QColor("red")
-            draw_leader = True
+        if self._cached_circle_rect is None:
+            self._rebuild_geometry()
+        fill_brush, border_pen, text_pen, draw_leader = _STYLE_TABLE[self._data.style]
 
         # --- Leader line + arrowhead ---
         if draw_leader:
-            tl = self._target_local()
-            pen = QPen(leader_color)
-            pen.setWidth(2)
-            pen.setCosmetic(True)
-            painter.setPen(pen)
-            painter.drawLine(QPointF(0, 0), tl)
-            self._draw_arrowhead(painter, QPointF(0, 0), tl, leader_color)
+            painter.setPen(_LEADER_PEN)
+            painter.drawLine(self._cached_leader)
+            if self._arrow_visible:
+                painter.setBrush(_LEADER_BRUSH)
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.drawConvexPolygon(self._arrow_poly)
 
         # --- Circle ---
-        if self.isSelected():
-            border_pen = QPen(QColor("#0078d7"), 2)
-        else:
-            border_pen = QPen(circle_border, 2)
-        border_pen.setCosmetic(True)
-        painter.setPen(border_pen)
-        if circle_fill is None:
+        painter.setPen(_SELECTED_PEN if self._selected else border_pen)
+        if fill_brush is None:
             painter.setBrush(Qt.BrushStyle.NoBrush)
         else:
-            painter.setBrush(QBrush(circle_fill))
-        painter.drawEllipse(QPointF(0, 0), r, r)
+            painter.setBrush(fill_brush)
+        painter.drawEllipse(self._cached_circle_rect)
 
         # --- Number ---
-        if self._data.font_size_override > 0:
-            font_size = max(1, int(self._data.font_size_override))
-        else:
-            font_size = max(6, int(r * 0.9))
-        font = QFont("Arial", font_size)
-        font.setBold(True)
-        painter.setFont(font)
-        painter.setPen(QPen(text_color))
+        painter.setFont(_label_font(self._cached_font_size))
+        painter.setPen(text_pen)
         painter.drawText(
-            QRectF(-r, -r, 2 * r, 2 * r),
+            self._cached_circle_rect,
             Qt.AlignmentFlag.AlignCenter,
             str(self._data.number),
         )
 
-    def _draw_arrowhead(self, painter: QPainter, from_pt: QPointF, to_pt: QPointF,
-                        color: QColor = None):
-        if color is None:
-            color = QColor("red")
+    def _update_arrowhead(self, from_pt: QPointF, to_pt: QPointF) -> bool:
+        """Write the arrowhead triangle (tip at *to_pt*) into ``_arrow_poly``.
+
+        Returns False if the leader is too short to carry an arrowhead.
+        """
         dx = to_pt.x() - from_pt.x()
         dy = to_pt.y() - from_pt.y()
-        length = math.hypot(dx, dy)
-        if length < 1:
-            return
-        ux, uy = dx / length, dy / length
+        length_sq = dx * dx + dy * dy
+        if length_sq < 1.0:
+            return False
+        inv_len = 1.0 / math.sqrt(length_sq)
+        ux, uy = dx * inv_len, dy * inv_len
         s = ARROW_HEAD_SIZE
-        left = QPointF(to_pt.x() - s * ux + s * 0.5 * uy,
-                       to_pt.y() - s * uy - s * 0.5 * ux)
-        right = QPointF(to_pt.x() - s * ux - s * 0.5 * uy,
-                        to_pt.y() - s * uy + s * 0.5 * ux)
-        painter.setBrush(QBrush(color))
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawPolygon(QPolygonF([to_pt, left, right]))
+        poly = self._arrow_poly
+        poly[0] = to_pt
+        poly[1] = QPointF(to_pt.x() - s * ux + s * 0.5 * uy,
+                          to_pt.y() - s * uy - s * 0.5 * ux)
+        poly[2] = QPointF(to_pt.x() - s * ux - s * 0.5 * uy,
+                          to_pt.y() - s * uy + s * 0.5 * ux)
+        return True
 
     # ------------------------------------------------------------------
     # Interaction
     # ------------------------------------------------------------------
 
     def itemChange(self, change, value):
-        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
-            self._scene_center = self.pos()
-            from app.utils import scene_to_pdf
-            self._data.balloon_center = scene_to_pdf(self.pos(), self._page_height)
-            self.signals.moved.emit(
-                self._data.uid,
-                self._data.balloon_center,
-                self._data.target_point,
-            )
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionChange:
+            # The target is fixed in scene space, so moving the circle
+            # reshapes the local bounding rect.
+            self.prepareGeometryChange()
+            self._invalidate_geom_cache()
+        elif change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
+            p = self.pos()
+            self._scene_center = p
+            # Ignore sub-pixel jitter (e.g. from a selection click); the data
+            # is only written together with the `moved` signal.
+            last = self._last_emitted_pos
+            dx = p.x() - last.x()
+            dy = p.y() - last.y()
+            if dx * dx + dy * dy >= 0.25:
+                self._move_coalesce_timer.start()
+        elif change == QGraphicsItem.GraphicsItemChange.ItemSelectedHasChanged:
+            self._selected = bool(value)
         return super().itemChange(change, value)
 
+    def _emit_moved(self):
+        p = self._scene_center
+        self._last_emitted_pos = QPointF(p)
+        # Inline scene_to_pdf, updating the stored point in place
+        center = self._data.balloon_center
+        center.setX(p.x())
+        center.setY(self._page_height - p.y())
+        self.signals.moved.emit(
+            self._data.uid,
+            self._data.balloon_center,
+            self._data.target_point,
+        )
+
+    def mouseReleaseEvent(self, event: QGraphicsSceneMouseEvent):
+        super().mouseReleaseEvent(event)
+        # Commit the final drag position synchronously, including a net
+        # move too small to have started the timer
+        self._move_coalesce_timer.stop()
+        if self._scene_center != self._last_emitted_pos:
+            self._emit_moved()
+        self._update_cache_mode()
+
     def contextMenuEvent(self, event: QGraphicsSceneMouseEvent):
         menu = QMenu()
         delete_action = menu.addAction("Delete balloon")
@@ -283,9 +434,9 @@ class BalloonItem(QGraphicsItem):
                 self._data.number, 1, 9999,
             )
             if ok:
-                self._data.number = num
+                # The window owns numbering: it needs the old number to free
+                # it, so it writes the new one back via set_number().
                 self.signals.number_changed.emit(self._data.uid, num)
-                self.update()
         elif action == edit_desc_action:
             desc, ok = QInputDialog.getText(
                 None, "Edit description", "Description:",
@@ -302,4 +453,6 @@ class BalloonItem(QGraphicsItem):
             if ok:
                 self.prepareGeometryChange()
                 self._data.diameter = d
+                self._invalidate_geom_cache()
+                self._update_cache_mode()
                 self.update()
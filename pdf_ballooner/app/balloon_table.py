@@ -1,9 +1,13 @@
 """Dockable side panel showing the balloon table."""
 from __future__ import annotations
 
-from PyQt6.QtCore import pyqtSignal, Qt
+import bisect
+
+from PyQt6.QtCore import (
+    pyqtSignal, Qt, QAbstractTableModel, QModelIndex,
+)
 from PyQt6.QtWidgets import (
-    QDockWidget, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
+    QDockWidget, QWidget, QVBoxLayout, QTableView,
     QHeaderView, QAbstractItemView,
 )
 
@@ -16,6 +20,162 @@ _COL_Y    = 3
 _COL_DESC = 4
 _HEADERS  = ["#", "Page", "X", "Y", "Description"]
 
+_DEFAULT_FLAGS = Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled  # read-only cells
+_EDIT_FLAGS    = _DEFAULT_FLAGS | Qt.ItemFlag.ItemIsEditable
+
+
+class BalloonTableModel(QAbstractTableModel):
+    """Sorted (page, number) view over the balloons; cells are produced on demand."""
+
+    description_changed = pyqtSignal(str, str)  # uid, new_description
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._balloons: dict[str, BalloonData] = {}   # uid -> data
+        # Sorted (page, number, uid) keys, one per row, with the matching
+        # data in _rows.  Keys are snapshots, so a balloon whose number/page
+        # was mutated in place can still be found at its old row.
+        self._order: list[tuple[int, int, str]] = []
+        self._rows: list[BalloonData] = []
+        self._row_for_uid: dict[str, int] = {}         # uid -> row index
+
+    # ------------------------------------------------------------------
+    # Qt model interface
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (role == Qt.ItemDataRole.DisplayRole and
+                orientation == Qt.Orientation.Horizontal):
+            return _HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        data = self._rows[index.row()]
+        col = index.column()
+        if col == _COL_NUM:
+            return str(data.number)
+        if col == _COL_PAGE:
+            return str(data.page + 1)
+        if col == _COL_X:
+            return f"{data.balloon_center.x():.1f}"
+        if col == _COL_Y:
+            return f"{data.balloon_center.y():.1f}"
+        return data.description
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        return _EDIT_FLAGS if index.column() == _COL_DESC else _DEFAULT_FLAGS
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        if role != Qt.ItemDataRole.EditRole or index.column() != _COL_DESC:
+            return False
+        data = self._rows[index.row()]
+        data.description = value
+        self.dataChanged.emit(index, index)
+        self.description_changed.emit(data.uid, value)
+        return True
+
+    # ------------------------------------------------------------------
+    # Balloon bookkeeping
+    # ------------------------------------------------------------------
+
+    def add_balloon(self, data: BalloonData):
+        if data.uid in self._row_for_uid:
+            self.update_balloon(data)
+            return
+        self._balloons[data.uid] = data
+        self._insert_row(data)
+
+    def remove_balloon(self, uid: str):
+        self._balloons.pop(uid, None)
+        self._remove_row(uid)
+
+    def update_balloon(self, data: BalloonData):
+        self._balloons[data.uid] = data
+        row = self._row_for_uid.get(data.uid)
+        if row is None:
+            self._insert_row(data)
+            return
+        page, number, _ = self._order[row]
+        if (page, number) != (data.page, data.number):
+            # Sort position changed — move the row
+            self._remove_row(data.uid)
+            self._insert_row(data)
+            return
+        self._rows[row] = data
+        self.dataChanged.emit(self.index(row, _COL_X), self.index(row, _COL_DESC))
+
+    def clear_all(self):
+        self._balloons.clear()
+        self._rebuild()
+
+    def set_balloons(self, balloons, presorted: bool = False):
+        """Replace every row in a single model reset.
+
+        Pass ``presorted=True`` when *balloons* is already in (page, number)
+        order to skip the re-sort.
+        """
+        if not presorted:
+            self._balloons = {b.uid: b for b in balloons}
+            self._rebuild()
+            return
+        rows = list(balloons)
+        self.beginResetModel()
+        self._balloons = {b.uid: b for b in rows}
+        self._rows = rows
+        self._order = [(b.page, b.number, b.uid) for b in rows]
+        self._row_for_uid = {b.uid: row for row, b in enumerate(rows)}
+        self.endResetModel()
+
+    def row_of(self, uid: str) -> int | None:
+        return self._row_for_uid.get(uid)
+
+    def uid_at(self, row: int) -> str | None:
+        if 0 <= row < len(self._order):
+            return self._order[row][2]
+        return None
+
+    def all_balloons(self) -> list[BalloonData]:
+        """Balloons in (page, number) order, read straight from the row index."""
+        return list(self._rows)
+
+    def _rebuild(self):
+        self.beginResetModel()
+        self._order = sorted((b.page, b.number, b.uid) for b in self._balloons.values())
+        self._rows = [self._balloons[uid] for _, _, uid in self._order]
+        self._row_for_uid = {uid: row for row, (_, _, uid) in enumerate(self._order)}
+        self.endResetModel()
+
+    def _insert_row(self, data: BalloonData):
+        key = (data.page, data.number, data.uid)
+        row = bisect.bisect_left(self._order, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._order.insert(row, key)
+        self._rows.insert(row, data)
+        self._reindex_from(row)
+        self.endInsertRows()
+
+    def _remove_row(self, uid: str):
+        row = self._row_for_uid.pop(uid, None)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._order[row]
+        del self._rows[row]
+        self._reindex_from(row)
+        self.endRemoveRows()
+
+    def _reindex_from(self, row: int):
+        for i in range(row, len(self._order)):
+            self._row_for_uid[self._order[i][2]] = i
+
 
 class BalloonTableWidget(QDockWidget):
     balloon_selected = pyqtSignal(str)          # uid
@@ -27,30 +187,24 @@ class BalloonTableWidget(QDockWidget):
             Qt.DockWidgetArea.RightDockWidgetArea |
             Qt.DockWidgetArea.LeftDockWidgetArea
         )
-        self._balloons: dict[str, BalloonData] = {}   # uid -> data
-        self._uid_for_row: list[str] = []              # row index -> uid
+        self._model = BalloonTableModel(self)
+        self._model.description_changed.connect(self.description_changed)
 
         container = QWidget()
         layout = QVBoxLayout(container)
         layout.setContentsMargins(4, 4, 4, 4)
 
-        self._table = QTableWidget(0, len(_HEADERS))
-        self._table.setHorizontalHeaderLabels(_HEADERS)
-        self._table.horizontalHeader().setSectionResizeMode(
-            _COL_DESC, QHeaderView.ResizeMode.Stretch
-        )
-        self._table.horizontalHeader().setSectionResizeMode(
-            _COL_NUM, QHeaderView.ResizeMode.ResizeToContents
-        )
-        self._table.horizontalHeader().setSectionResizeMode(
-            _COL_PAGE, QHeaderView.ResizeMode.ResizeToContents
-        )
-        self._table.horizontalHeader().setSectionResizeMode(
-            _COL_X, QHeaderView.ResizeMode.ResizeToContents
-        )
-        self._table.horizontalHeader().setSectionResizeMode(
-            _COL_Y, QHeaderView.ResizeMode.ResizeToContents
-        )
+        self._table = QTableView()
+        self._table.setModel(self._model)
+        header = self._table.horizontalHeader()
+        for col, mode in (
+            (_COL_DESC, QHeaderView.ResizeMode.Stretch),
+            (_COL_NUM,  QHeaderView.ResizeMode.ResizeToContents),
+            (_COL_PAGE, QHeaderView.ResizeMode.ResizeToContents),
+            (_COL_X,    QHeaderView.ResizeMode.ResizeToContents),
+            (_COL_Y,    QHeaderView.ResizeMode.ResizeToContents),
+        ):
+            header.setSectionResizeMode(col, mode)
         self._table.setSelectionBehavior(
             QAbstractItemView.SelectionBehavior.SelectRows
         )
@@ -59,8 +213,7 @@ class BalloonTableWidget(QDockWidget):
             QAbstractItemView.EditTrigger.SelectedClicked
         )
         self._table.verticalHeader().setVisible(False)
-        self._table.cellClicked.connect(self._on_row_clicked)
-        self._table.cellChanged.connect(self._on_cell_changed)
+        self._table.clicked.connect(self._on_row_clicked)
 
         layout.addWidget(self._table)
         self.setWidget(container)
@@ -71,78 +224,36 @@ class BalloonTableWidget(QDockWidget):
     # ------------------------------------------------------------------
 
     def add_balloon(self, data: BalloonData):
-        self._balloons[data.uid] = data
-        self._rebuild()
+        self._model.add_balloon(data)
 
     def remove_balloon(self, uid: str):
-        self._balloons.pop(uid, None)
-        self._rebuild()
+        self._model.remove_balloon(uid)
 
     def update_balloon(self, data: BalloonData):
-        self._balloons[data.uid] = data
-        self._rebuild()
+        self._model.update_balloon(data)
 
     def clear_all(self):
-        self._balloons.clear()
-        self._rebuild()
+        self._model.clear_all()
+
+    def set_balloons(self, balloons, presorted: bool = False):
+        """Bulk replace the table contents; the view repaints once."""
+        self._model.set_balloons(balloons, presorted)
 
     def select_balloon(self, uid: str):
         """Highlight the row corresponding to uid."""
-        try:
-            row = self._uid_for_row.index(uid)
-        except ValueError:
+        row = self._model.row_of(uid)
+        if row is None:
             return
         self._table.selectRow(row)
 
     def all_balloons(self) -> list[BalloonData]:
-        return sorted(self._balloons.values(), key=lambda b: (b.page, b.number))
+        return self._model.all_balloons()
 
     # ------------------------------------------------------------------
     # Internal
     # ------------------------------------------------------------------
 
-    def _rebuild(self):
-        self._table.blockSignals(True)
-        self._table.setRowCount(0)
-        self._uid_for_row.clear()
-
-        for data in sorted(self._balloons.values(), key=lambda b: (b.page, b.number)):
-            row = self._table.rowCount()
-            self._table.insertRow(row)
-            self._uid_for_row.append(data.uid)
-
-            num_item = QTableWidgetItem(str(data.number))
-            num_item.setFlags(num_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self._table.setItem(row, _COL_NUM, num_item)
-
-            page_item = QTableWidgetItem(str(data.page + 1))
-            page_item.setFlags(page_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self._table.setItem(row, _COL_PAGE, page_item)
-
-            x_item = QTableWidgetItem(f"{data.balloon_center.x():.1f}")
-            x_item.setFlags(x_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self._table.setItem(row, _COL_X, x_item)
-
-            y_item = QTableWidgetItem(f"{data.balloon_center.y():.1f}")
-            y_item.setFlags(y_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self._table.setItem(row, _COL_Y, y_item)
-
-            desc_item = QTableWidgetItem(data.description)
-            self._table.setItem(row, _COL_DESC, desc_item)
-
-        self._table.blockSignals(False)
-
-    def _on_row_clicked(self, row: int, col: int):
-        if row < len(self._uid_for_row):
-            self.balloon_selected.emit(self._uid_for_row[row])
-
-    def _on_cell_changed(self, row: int, col: int):
-        if col != _COL_DESC:
-            return
-        if row >= len(self._uid_for_row):
-            return
-        uid = self._uid_for_row[row]
-        new_desc = self._table.item(row, col).text()
-        if uid in self._balloons:
-            self._balloons[uid].description = new_desc
-            self.description_changed.emit(uid, new_desc)
+    def _on_row_clicked(self, index: QModelIndex):
+        uid = self._model.uid_at(index.row())
+        if uid is not None:
+            self.balloon_selected.emit(uid)
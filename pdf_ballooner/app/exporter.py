@@ -2,225 +2,309 @@
 from __future__ import annotations
 
 import csv
-import math
+import os
+from math import sqrt
 from datetime import date
-from pathlib import Path
+from functools import lru_cache
+from operator import attrgetter
+from types import SimpleNamespace
+from typing import Callable, Iterable
 
 import fitz  # PyMuPDF
 
 from app.balloon import BalloonData
 
+# PyMuPDF accepts plain (x, y) tuples wherever it takes a point, which avoids
+# allocating a fitz.Point per primitive.
+_Pt = tuple[float, float]
 
-def _transform_coords(bx: float, by: float, rotation: int,
-                       w: float, h: float) -> tuple[float, float]:
-    """Map balloon coords from the viewer's rotated space to original page space.
 
+# Indexed by BalloonStyle:
+# (leader colour, circle stroke, circle fill or None, text colour, draw leader)
+_STYLE_TABLE: tuple[tuple[tuple, tuple, tuple | None, tuple, bool], ...] = (
+    # DEFAULT — transparent circle
+    ((0.8, 0, 0), (0, 0, 0),   None,      (0, 0, 0),   True),
+    # RED — red filled circle, white number
+    ((0.8, 0, 0), (0, 0, 0),   (1, 0, 0), (1, 1, 1),   True),
+    # OUTLINE
+    ((0.8, 0, 0), (0, 0, 0),   None,      (0, 0, 0),   True),
+    # NO_ARROW — red outline, red number
+    ((0.8, 0, 0), (0.8, 0, 0), None,      (0.8, 0, 0), False),
+)
+
+
+@lru_cache(maxsize=None)
+def _label_font() -> fitz.Font:
+    """Helvetica-Bold for balloon numbers, loaded once per process."""
+    return fitz.Font("hebo")
+
+
+def _coord_transform(rotation: int, w: float,
+                     h: float) -> Callable[[float, float], _Pt] | None:
+    """Return a function mapping viewer (rotated) coords to original page space,
+    or None for an unrotated page, where the coords already match.
+
+    The rotation branch is resolved once per page rather than once per point.
     *w* and *h* are the **original** (unrotated) page width and height.
     """
     if rotation == 90:
-        return (w - by, bx)
+        return lambda x, y: (w - y, x)
+    elif rotation == 180:
+        return lambda x, y: (w - x, h - y)
+    elif rotation == 270:
+        return lambda x, y: (y, h - x)
+    return None
+
+
+def _label_origin(rotation: int) -> Callable[[float, float, float, float], _Pt]:
+    """Return a function giving the insert_text point for a label centred at
+    (cx, cy), from its half width and baseline drop.
+
+    When the page has user rotation, text must be pre-rotated to appear
+    upright after the viewer applies page rotation.
+    insert_text rotate: 0=LTR, 90=BTT, 180=RTL, 270=TTB
+    Point meanings:
+      rotate=0:   bottom-left of first char
+      rotate=90:  bottom-right of first char
+      rotate=180: top-right of first char
+      rotate=270: top-left of first char
+    """
+    if rotation == 90:
+        return lambda cx, cy, half_w, drop: (cx + drop, cy + half_w)
     elif rotation == 180:
-        return (w - bx, h - by)
+        return lambda cx, cy, half_w, drop: (cx + half_w, cy - drop)
     elif rotation == 270:
-        return (by, h - bx)
-    return (bx, by)
+        return lambda cx, cy, half_w, drop: (cx - drop, cy - half_w)
+    return lambda cx, cy, half_w, drop: (cx - half_w, cy + drop)
 
 
-def export_pdf(src_path: str, dst_path: str, balloons: list[BalloonData],
-               page_rotations: dict[int, int] | None = None) -> None:
-    """Write a new PDF to *dst_path* with balloons drawn as vector overlays."""
-    if Path(src_path).resolve() == Path(dst_path).resolve():
+def export_pdf(src_path: str, dst_path: str, balloons: Iterable[BalloonData],
+               page_rotations: dict[int, int] | None = None,
+               garbage: int = 1, compress: bool = True) -> None:
+    """Write a new PDF to *dst_path* with balloons drawn as vector overlays.
+
+    *garbage* (0-4) and *compress* are passed to ``Document.save`` as
+    ``garbage`` / ``deflate``.  Level 1 only drops unused objects and is much
+    faster on large drawings; level 4 also merges duplicate streams for a
+    slightly smaller file at a far higher save time.
+    """
+    # abspath is pure string work; only stat the files when the destination
+    # already exists and could be the source under another name (symlink).
+    if os.path.abspath(src_path) == os.path.abspath(dst_path) or (
+            os.path.exists(dst_path) and os.path.samefile(src_path, dst_path)):
         raise ValueError("Cannot overwrite the original PDF. Choose a different output path.")
 
     if page_rotations is None:
         page_rotations = {}
 
+    # Bucket balloons by page in one pass instead of rescanning per page.
+    by_page: dict[int, list[BalloonData]] = {}
+    for b in balloons:
+        by_page.setdefault(b.page, []).append(b)
+
     doc = fitz.open(src_path)
 
     for page_idx in range(len(doc)):
-        page = doc[page_idx]
         rotation = page_rotations.get(page_idx, 0) % 360
+        # pop() releases each bucket once its page is drawn.
+        page_balloons = by_page.pop(page_idx, None)
+        # Untouched pages are never loaded: doc[i] parses the page object.
+        if not page_balloons and not rotation:
+            continue
 
+        page = doc[page_idx]
         # Apply user rotation to the page so PDF viewers show it rotated.
         if rotation:
             page.set_rotation((page.rotation + rotation) % 360)
+        if not page_balloons:
+            continue
 
         # Original (unrotated) page dimensions for coordinate transforms.
         orig_w = page.mediabox.width
         orig_h = page.mediabox.height
 
-        page_balloons = [b for b in balloons if b.page == page_idx]
-        if not page_balloons:
-            continue
-
+        to_page = _coord_transform(rotation, orig_w, orig_h)
+        label_origin = _label_origin(rotation)
         shape = page.new_shape()
+        # Primitives are grouped by paint so each group needs one finish():
+        # Shape.finish() styles everything drawn since the previous finish().
+        # leader colour -> [(edge, target)], (stroke, fill) -> [(center, r)]
+        leaders: dict[tuple, list[tuple[_Pt, _Pt]]] = {}
+        circles: dict[tuple, list[tuple[_Pt, float]]] = {}
         # Collect text insertions so we can draw them AFTER shape.commit(),
         # ensuring numbers render on top of the filled circles.
-        # Each entry: (point, text, font_size, color, rotation)
-        text_items: list[tuple[fitz.Point, str, float, tuple, int]] = []
+        # Each entry: (point, text, font_size, color)
+        text_items: list[tuple[_Pt, str, float, tuple]] = []
 
         for b in page_balloons:
             # Transform balloon coordinates from rotated viewer space
             # back to original page coordinate space.
-            cx, cy = _transform_coords(
-                b.balloon_center.x(), b.balloon_center.y(),
-                rotation, orig_w, orig_h,
-            )
-            tx, ty = _transform_coords(
-                b.target_point.x(), b.target_point.y(),
-                rotation, orig_w, orig_h,
-            )
+            bc, tp = b.balloon_center, b.target_point
+            if to_page is None:
+                cx, cy, tx, ty = bc.x(), bc.y(), tp.x(), tp.y()
+            else:
+                cx, cy = to_page(bc.x(), bc.y())
+                tx, ty = to_page(tp.x(), tp.y())
             r  = b.diameter / 2.0
-            style = b.style
-
-            # Resolve colours and leader flag by style
-            if style == "red":
-                leader_color  = (0.8, 0, 0)
-                circle_stroke = (0, 0, 0)
-                circle_fill   = (1, 0, 0)
-                text_color    = (1, 1, 1)
-                draw_leader   = True
-            elif style == "outline":
-                leader_color  = (0.8, 0, 0)
-                circle_stroke = (0, 0, 0)
-                circle_fill   = None
-                text_color    = (0, 0, 0)
-                draw_leader   = True
-            elif style == "no_arrow":
-                leader_color  = (0.8, 0, 0)
-                circle_stroke = (0.8, 0, 0)  # red outline
-                circle_fill   = None          # transparent
-                text_color    = (0.8, 0, 0)  # red number
-                draw_leader   = False
-            else:  # "default"
-                leader_color  = (0.8, 0, 0)
-                circle_stroke = (0, 0, 0)
-                circle_fill   = None          # transparent
-                text_color    = (0, 0, 0)
-                draw_leader   = True
-
-            target = fitz.Point(tx, ty)
-            center = fitz.Point(cx, cy)
+
+            leader_color, circle_stroke, circle_fill, text_color, draw_leader = \
+                _STYLE_TABLE[b.style]
+
+            target = (tx, ty)
+            center = (cx, cy)
 
             # --- Leader line + arrowhead ---
             if draw_leader:
                 dx = tx - cx
                 dy = ty - cy
-                dist = math.hypot(dx, dy)
-                edge = fitz.Point(cx + dx / dist * r, cy + dy / dist * r) if dist > 0 \
-                       else fitz.Point(cx, cy - r)
-                shape.draw_line(edge, target)
-                shape.finish(color=leader_color, width=1.5, stroke_opacity=1.0)
-                _draw_arrowhead(shape, edge, target, size=5, color=leader_color)
+                dist_sq = dx * dx + dy * dy
+                if dist_sq > 0:
+                    k = r / sqrt(dist_sq)
+                    edge = (cx + dx * k, cy + dy * k)
+                else:
+                    edge = (cx, cy - r)
+                leaders.setdefault(leader_color, []).append((edge, target))
 
             # --- Circle ---
-            shape.draw_circle(center, r)
-            if circle_fill is not None:
-                shape.finish(color=circle_stroke, fill=circle_fill, width=1.5, fill_opacity=1.0)
-            else:
-                shape.finish(color=circle_stroke, width=1.5, fill_opacity=0.0)
+            circles.setdefault((circle_stroke, circle_fill), []).append((center, r))
 
             # --- Collect number label for later insertion ---
             font_size = b.font_size_override if b.font_size_override > 0 else max(4.0, r * 1.1)
-            text  = str(b.number)
-            est_w = 0.6 * font_size * len(text)
-
-            # Compute insertion point based on text rotation.
-            # When the page has user rotation, text must be pre-rotated
-            # to appear upright after the viewer applies page rotation.
-            # insert_text rotate: 0=LTR, 90=BTT, 180=RTL, 270=TTB
-            # Point meanings:
-            #   rotate=0:   bottom-left of first char
-            #   rotate=90:  bottom-right of first char
-            #   rotate=180: top-right of first char
-            #   rotate=270: top-left of first char
-            if rotation == 90:
-                pt = fitz.Point(cx + font_size * 0.35, cy + est_w / 2)
-            elif rotation == 180:
-                pt = fitz.Point(cx + est_w / 2, cy - font_size * 0.35)
-            elif rotation == 270:
-                pt = fitz.Point(cx - font_size * 0.35, cy - est_w / 2)
-            else:
-                pt = fitz.Point(cx - est_w / 2, cy + font_size * 0.35)
+            text = str(b.number)
+            # Half the estimated text width (0.6 em per digit) and baseline drop
+            pt = label_origin(cx, cy, 0.3 * font_size * len(text), font_size * 0.35)
+
+            text_items.append((pt, text, font_size, text_color))
 
-            text_items.append((pt, text, font_size, text_color, rotation))
+        # Leaders and arrowheads first so the circles are drawn over them.
+        for color, segments in leaders.items():
+            for edge, target in segments:
+                shape.draw_line(edge, target)
+            shape.finish(color=color, width=1.5, stroke_opacity=1.0)
+            for edge, target in segments:
+                _draw_arrowhead(shape, edge, target, size=5)
+            shape.finish(color=color, fill=color, width=0)
+
+        for (stroke, fill), discs in circles.items():
+            for center, r in discs:
+                shape.draw_circle(center, r)
+            if fill is not None:
+                shape.finish(color=stroke, fill=fill, width=1.5, fill_opacity=1.0)
+            else:
+                shape.finish(color=stroke, width=1.5, fill_opacity=0.0)
 
         # Commit all shapes (leaders, circles) to the page first.
         shape.commit()
 
         # Now insert text on top so numbers are visible over the circles.
-        for pt, text, font_size, color, text_rot in text_items:
-            page.insert_text(
-                pt, text,
-                fontname="hebo",
-                fontsize=font_size,
-                color=color,
-                rotate=text_rot,
-            )
-
-    doc.save(dst_path, garbage=4, deflate=True)
+        if rotation or page.rotation:
+            # TextWriter cannot rotate individual strings, so labels turned by
+            # the user's rotation keep one insert_text call each; so do pages
+            # with their own /Rotate, whose labels insert_text already places.
+            for pt, text, font_size, color in text_items:
+                page.insert_text(
+                    pt, text,
+                    fontname="hebo",
+                    fontsize=font_size,
+                    color=color,
+                    rotate=rotation,
+                )
+        else:
+            # One TextWriter per colour: every label is written in one call.
+            font = _label_font()
+            writers: dict[tuple, fitz.TextWriter] = {}
+            for pt, text, font_size, color in text_items:
+                tw = writers.get(color)
+                if tw is None:
+                    tw = writers[color] = fitz.TextWriter(page.rect, color=color)
+                tw.append(pt, text, font=font, fontsize=font_size)
+            for tw in writers.values():
+                tw.write_text(page)
+
+    doc.save(dst_path, garbage=garbage, deflate=compress)
     doc.close()
 
 
-def _draw_arrowhead(shape: fitz.Shape, from_pt: fitz.Point,
-                    to_pt: fitz.Point, size: float = 6,
-                    color: tuple = (0.8, 0, 0)) -> None:
-    dx = to_pt.x - from_pt.x
-    dy = to_pt.y - from_pt.y
-    length = math.hypot(dx, dy)
-    if length < 1:
+def _draw_arrowhead(shape: fitz.Shape, from_pt: _Pt,
+                    to_pt: _Pt, size: float = 6) -> None:
+    """Draw an arrowhead outline at *to_pt*; the caller finish()es it."""
+    fx, fy = from_pt
+    tx, ty = to_pt
+    dx = tx - fx
+    dy = ty - fy
+    length_sq = dx * dx + dy * dy
+    if length_sq < 1.0:
         return
-    ux, uy = dx / length, dy / length
+    inv_len = 1.0 / sqrt(length_sq)
+    ux, uy = dx * inv_len, dy * inv_len
     px, py = -uy, ux
     half = size * 0.45
-    left  = fitz.Point(to_pt.x - size * ux + half * px,
-                        to_pt.y - size * uy + half * py)
-    right = fitz.Point(to_pt.x - size * ux - half * px,
-                        to_pt.y - size * uy - half * py)
+    left  = (tx - size * ux + half * px, ty - size * uy + half * py)
+    right = (tx - size * ux - half * px, ty - size * uy - half * py)
     shape.draw_polyline([to_pt, left, right, to_pt])
-    shape.finish(color=color, fill=color, width=0)
 
 
-def export_csv(dst_path: str, balloons: list[BalloonData]) -> None:
+def export_csv(dst_path: str, balloons: Iterable[BalloonData]) -> None:
     """Write balloon data to a CSV file."""
     with open(dst_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(["Number", "Page", "X (pts)", "Y (pts)", "Description"])
-        for b in sorted(balloons, key=lambda x: (x.page, x.number)):
-            writer.writerow([
+        writer.writerows(
+            (
                 b.number,
                 b.page + 1,
                 round(b.balloon_center.x(), 2),
                 round(b.balloon_center.y(), 2),
                 b.description,
-            ])
+            )
+            for b in sorted(balloons, key=attrgetter("page", "number"))
+        )
 
 
-def export_excel(dst_path: str, balloons: list[BalloonData],
-                 drawing_name: str = "") -> None:
-    """Write a formatted inspection-sheet Excel workbook to *dst_path*."""
-    import openpyxl
+@lru_cache(maxsize=None)
+def _excel_styles() -> SimpleNamespace:
+    """Build the inspection-sheet styles once per process.
+
+    openpyxl is imported lazily so the app starts without it; style objects
+    are immutable and can be shared by every workbook.
+    """
     from openpyxl.styles import (
         Alignment, Border, Font, PatternFill, Side,
     )
+
+    thin_side = Side(style="thin", color="AAAAAA")
+    center    = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    left      = Alignment(horizontal="left",   vertical="center", wrap_text=True)
+    return SimpleNamespace(
+        hdr_fill   = PatternFill("solid", fgColor="1F4E79"),   # dark blue
+        alt_fill   = PatternFill("solid", fgColor="D6E4F0"),   # light blue
+        title_font = Font(name="Calibri", bold=True, size=16, color="FFFFFF"),
+        hdr_font   = Font(name="Calibri", bold=True, size=10, color="FFFFFF"),
+        body_font  = Font(name="Calibri", size=10),
+        bold_font  = Font(name="Calibri", bold=True, size=10),
+        thin_bdr   = Border(left=thin_side, right=thin_side,
+                            top=thin_side, bottom=thin_side),
+        center     = center,
+        left       = left,
+        title_align = Alignment(horizontal="center", vertical="center"),
+        right_align = Alignment(horizontal="right", vertical="center"),
+        # Per-column alignment of the data rows (columns A..G)
+        col_align  = (center, center, left, left, center, center, left),
+    )
+
+
+def export_excel(dst_path: str, balloons: Iterable[BalloonData],
+                 drawing_name: str = "") -> None:
+    """Write a formatted inspection-sheet Excel workbook to *dst_path*."""
+    import openpyxl
     from openpyxl.utils import get_column_letter
 
+    st = _excel_styles()
+
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "Inspection Sheet"
 
-    # ---- Palette ----
-    hdr_fill   = PatternFill("solid", fgColor="1F4E79")   # dark blue
-    alt_fill   = PatternFill("solid", fgColor="D6E4F0")   # light blue
-    title_font = Font(name="Calibri", bold=True, size=14, color="FFFFFF")
-    hdr_font   = Font(name="Calibri", bold=True, size=10, color="FFFFFF")
-    body_font  = Font(name="Calibri", size=10)
-    thin_side  = Side(style="thin", color="AAAAAA")
-    thin_bdr   = Border(left=thin_side, right=thin_side,
-                        top=thin_side, bottom=thin_side)
-    center     = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    left       = Alignment(horizontal="left",   vertical="center", wrap_text=True)
-
     # ---- Column widths ----
     col_widths = [6, 7, 55, 22, 14, 12, 22]
     for i, w in enumerate(col_widths, 1):
@@ -230,21 +314,21 @@ def export_excel(dst_path: str, balloons: list[BalloonData],
     ws.merge_cells("A1:G1")
     title_cell = ws["A1"]
     title_cell.value = "INSPECTION SHEET"
-    title_cell.font  = Font(name="Calibri", bold=True, size=16, color="FFFFFF")
-    title_cell.fill  = hdr_fill
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
+    title_cell.font  = st.title_font
+    title_cell.fill  = st.hdr_fill
+    title_cell.alignment = st.title_align
     ws.row_dimensions[1].height = 28
 
     # ---- Row 2: drawing name + date ----
     ws.merge_cells("A2:D2")
     ws["A2"].value = f"Drawing: {drawing_name}" if drawing_name else "Drawing:"
-    ws["A2"].font  = Font(name="Calibri", bold=True, size=10)
-    ws["A2"].alignment = left
+    ws["A2"].font  = st.bold_font
+    ws["A2"].alignment = st.left
 
     ws.merge_cells("E2:G2")
-    ws["E2"].value = f"Date: {date.today().strftime('%Y-%m-%d')}"
-    ws["E2"].font  = Font(name="Calibri", size=10)
-    ws["E2"].alignment = Alignment(horizontal="right", vertical="center")
+    ws["E2"].value = f"Date: {date.today().isoformat()}"
+    ws["E2"].font  = st.body_font
+    ws["E2"].alignment = st.right_align
     ws.row_dimensions[2].height = 18
 
     # ---- Row 3: blank spacer ----
@@ -255,22 +339,24 @@ def export_excel(dst_path: str, balloons: list[BalloonData],
                "Nominal / Spec", "Actual", "Result", "Notes"]
     for col, text in enumerate(headers, 1):
         cell = ws.cell(row=4, column=col, value=text)
-        cell.font      = hdr_font
-        cell.fill      = hdr_fill
-        cell.alignment = center
-        cell.border    = thin_bdr
+        cell.font      = st.hdr_font
+        cell.fill      = st.hdr_fill
+        cell.alignment = st.center
+        cell.border    = st.thin_bdr
     ws.row_dimensions[4].height = 20
 
     # ---- Data rows (starting at row 5) ----
-    sorted_bs = sorted(balloons, key=lambda b: (b.page, b.number))
+    body_font, thin_bdr, alt_fill = st.body_font, st.thin_bdr, st.alt_fill
+    col_align = st.col_align
+    sorted_bs = sorted(balloons, key=attrgetter("page", "number"))
     for row_idx, b in enumerate(sorted_bs, 5):
         fill = alt_fill if row_idx % 2 == 1 else None
-        values = [b.number, b.page + 1, b.description or "", "", "", "", ""]
-        for col, val in enumerate(values, 1):
+        values = (b.number, b.page + 1, b.description or "", "", "", "", "")
+        for col, (val, align) in enumerate(zip(values, col_align), 1):
             cell = ws.cell(row=row_idx, column=col, value=val)
             cell.font      = body_font
             cell.border    = thin_bdr
-            cell.alignment = center if col in (1, 2, 5, 6) else left
+            cell.alignment = align
             if fill:
                 cell.fill = fill
         ws.row_dimensions[row_idx].height = 16
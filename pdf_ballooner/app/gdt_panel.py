@@ -13,16 +13,18 @@ is then exported to the CSV / Excel inspection sheet.
 """
 from __future__ import annotations
 
-from PyQt6.QtCore import Qt, pyqtSignal
+from functools import lru_cache, partial
+
+from PyQt6.QtCore import Qt, QSignalBlocker, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import (
     QDockWidget, QWidget, QGridLayout, QPushButton,
     QLabel, QVBoxLayout, QHBoxLayout, QLineEdit,
-    QComboBox, QFrame, QTabWidget,
+    QComboBox, QFrame, QTabWidget, QButtonGroup,
 )
 
 # ── GD&T characteristic symbols ─────────────────────────────────────────────
-GDT_CHARACTERISTICS = [
+GDT_CHARACTERISTICS = (
     ("⊕",  "True Position"),
     ("⏤",  "Straightness"),
     ("⏥",  "Flatness"),
@@ -37,12 +39,12 @@ GDT_CHARACTERISTICS = [
     ("⌯",  "Symmetry"),
     ("↗",  "Circular Runout"),
     ("⇗",  "Total Runout"),
-]
+)
 
 # ── Modifier buttons: (label, tooltip, group) ─────────────────────────────
 # group "mat"  = mutually exclusive (M/L/S)
 # group "zone" = independent toggle
-MODIFIERS = [
+MODIFIERS = (
     ("Ⓜ",  "Max Material Condition (MMC)",   "mat"),
     ("Ⓛ",  "Least Material Condition (LMC)", "mat"),
     ("Ⓢ",  "Regardless of Feature Size",     "mat"),
@@ -50,28 +52,28 @@ MODIFIERS = [
     ("T",   "Tangent Plane",                  "zone"),
     ("P",   "Projected Tolerance Zone",        "zone"),
     ("ST",  "Statistical Tolerance",           "zone"),
-]
+)
 
 # ── Dimension types ──────────────────────────────────────────────────────────
-DIMENSION_TYPES = [
+DIMENSION_TYPES = (
     ("",   "Linear"),
     ("⌀",  "Diameter"),
     ("R",  "Radius"),
     ("□",  "Square / Width"),
     ("∠",  "Angular  (°)"),
-]
+)
 
 # ── Surface roughness ────────────────────────────────────────────────────────
 # Process restriction → symbol prefix (closest Unicode approximation)
-SURFACE_PROCESS = [
+SURFACE_PROCESS = (
     ("√",  "Any process"),
     ("√̄",  "Machining required"),
     ("⊙√", "No machining / as-cast"),
-]
+)
 
-SURFACE_PARAMS = ["Ra", "Rz", "Rmax", "Rt", "Rq", "Rsk", "Rku"]
+SURFACE_PARAMS = ("Ra", "Rz", "Rmax", "Rt", "Rq", "Rsk", "Rku")
 
-SURFACE_GRADES = [
+SURFACE_GRADES = (
     ("",      "Custom value"),
     ("0.025", "N1"),
     ("0.05",  "N2"),
@@ -85,9 +87,9 @@ SURFACE_GRADES = [
     ("12.5",  "N10"),
     ("25",    "N11"),
     ("50",    "N12"),
-]
+)
 
-SURFACE_LAY = [
+SURFACE_LAY = (
     ("",  "—  (not specified)"),
     ("=", "=   Parallel to projection plane"),
     ("⊥", "⊥  Perpendicular"),
@@ -96,7 +98,91 @@ SURFACE_LAY = [
     ("C", "C   Circular"),
     ("R", "R   Radial"),
     ("P", "P   Particulate / non-directional"),
-]
+)
+
+# Combo values by row, so the string builders can index them with
+# currentIndex() instead of unboxing QVariant user data.
+_SYM_BY_IDX          = tuple(sym for sym, _ in GDT_CHARACTERISTICS)
+_DIM_PREFIX_BY_IDX   = tuple(prefix for prefix, _ in DIMENSION_TYPES)
+_SURF_PROCESS_BY_IDX = tuple(sym for sym, _ in SURFACE_PROCESS)
+_SURF_GRADE_BY_IDX   = tuple(val for val, _ in SURFACE_GRADES)
+_SURF_LAY_BY_IDX     = tuple(sym for sym, _ in SURFACE_LAY)
+
+# Combo display text, formatted once at import rather than per panel build
+_SYM_LABELS          = [f"{sym}  {name}" for sym, name in GDT_CHARACTERISTICS]
+_DIM_TYPE_LABELS     = [f"{prefix}  {name}" if prefix else name
+                        for prefix, name in DIMENSION_TYPES]
+_SURF_PROCESS_LABELS = [f"{sym}  {name}" for sym, name in SURFACE_PROCESS]
+_SURF_PARAM_LABELS   = list(SURFACE_PARAMS)
+_SURF_GRADE_LABELS   = [label for _, label in SURFACE_GRADES]
+_SURF_LAY_LABELS     = [name for _, name in SURFACE_LAY]
+
+# Arial fonts shared by every panel widget, keyed by (size, bold).  Built on
+# first use because QFont needs a running QApplication.
+_FONT_CACHE: dict[tuple[int, bool], QFont] = {}
+
+
+def _arial(size: int, bold: bool = False) -> QFont:
+    font = _FONT_CACHE.get((size, bold))
+    if font is None:
+        font = QFont("Arial", size)
+        font.setBold(bold)
+        _FONT_CACHE[size, bold] = font
+    return font
+
+
+# ── String composition ──────────────────────────────────────────────────────
+# Pure functions of the widget values, cached across previews and balloons:
+# the same callout is usually entered many times on one drawing.
+
+@lru_cache(maxsize=256)
+def _compose_gdt(sym: str, tol_text: str, dia_on: bool, mat_mod: str,
+                 zone: str, datums: tuple[str, ...]) -> str:
+    """*datums* holds only the filled-in datum letters, in order."""
+    sym = sym or "?"
+    tol = tol_text.strip()
+    dia = "⌀" if dia_on else ""
+
+    # Common case: a bare tolerance with no modifiers or datums
+    if not (mat_mod or zone or datums):
+        return f"| {sym} | {dia}{tol} |"
+
+    zone_str = f"({zone})" if zone else ""
+    tol_cell = f"{dia}{tol}{mat_mod}{zone_str}"
+    return f"| {' | '.join((sym, tol_cell, *datums))} |"
+
+
+@lru_cache(maxsize=256)
+def _compose_dim(prefix: str, nominal_text: str, upper_text: str,
+                 lower_text: str) -> str:
+    nominal = nominal_text.strip()
+    upper = upper_text.strip()
+    lower = lower_text.strip()
+    # Append degree sign for angular dimensions
+    suffix = "°" if prefix == "∠" else ""
+    s = f"{prefix}{nominal}{suffix}"
+    if upper != "+0.000" or lower != "-0.000":
+        # Bilateral symmetric tolerance
+        upper_mag = upper.lstrip("+")
+        if upper_mag == lower.lstrip("-"):
+            s += f" ±{upper_mag}{suffix}"
+        else:
+            s += f"  {upper}{suffix} / {lower}{suffix}"
+    return s
+
+
+@lru_cache(maxsize=256)
+def _compose_surface(sym: str, param: str, value_text: str, units: str,
+                     lay: str, meth_text: str) -> str:
+    sym  = sym or "√"
+    meth = meth_text.strip()
+
+    parts = [f"{sym} {param} {value_text.strip()} {units}"]
+    if lay:
+        parts.append(f"Lay: {lay}")
+    if meth:
+        parts.append(meth)
+    return "  |  ".join(parts)
 
 
 class GDTPanelWidget(QDockWidget):
@@ -112,7 +198,28 @@ class GDTPanelWidget(QDockWidget):
         )
         self.setMinimumWidth(310)
 
+        # Text currently shown by each preview label, compared in Python so
+        # an unchanged preview costs no QLabel round-trip.
+        self._gdt_shown = ""
+        self._dim_shown = ""
+        self._surf_shown = ""
+
+        # Preview refreshes are coalesced: a burst of keystrokes or toggles
+        # schedules each affected preview once, on the next timer tick.
+        self._pending_previews: set = set()
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(30)
+        self._preview_timer.timeout.connect(self._flush_previews)
+
+        # "Enter" buttons of the tabs built so far; enabled while a balloon
+        # is selected.
+        self._apply_btns: list[QPushButton] = []
+        self._balloon_active = False
+
         root = QWidget()
+        # One stylesheet for all preview frames, parsed once for the panel
+        root.setStyleSheet("QFrame#preview { background:#eef3ff; border-radius:4px; }")
         root_vl = QVBoxLayout(root)
         root_vl.setContentsMargins(4, 4, 4, 4)
         root_vl.setSpacing(4)
@@ -135,15 +242,29 @@ class GDTPanelWidget(QDockWidget):
         self._tabs = QTabWidget()
         root_vl.addWidget(self._tabs)
         self._tabs.addTab(self._build_gdt_tab(), "GD&T")
-        self._tabs.addTab(self._build_dim_tab(), "123 Dimension")
-        self._tabs.addTab(self._build_surface_tab(), "⊙ Surface")
+        # The other tabs start as empty pages and are built on first show.
+        self._lazy_tabs: dict[int, tuple] = {}
+        for build, update, name in (
+            (self._build_dim_tab, self._update_dim_preview, "123 Dimension"),
+            (self._build_surface_tab, self._update_surface_preview, "⊙ Surface"),
+        ):
+            page = QWidget()
+            QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+            self._lazy_tabs[self._tabs.addTab(page, name)] = (build, update)
+        self._tabs.currentChanged.connect(self._ensure_tab_built)
 
         root_vl.addStretch()
         self.setWidget(root)
 
         self._update_gdt_preview()
-        self._update_dim_preview()
-        self._update_surface_preview()
+
+    def _ensure_tab_built(self, idx: int):
+        entry = self._lazy_tabs.pop(idx, None)
+        if entry is None:
+            return
+        build, update = entry
+        self._tabs.widget(idx).layout().addWidget(build())
+        update()
 
     # ────────────────────────────────────────────────────────────────────
     # GD&T tab
@@ -163,25 +284,24 @@ class GDTPanelWidget(QDockWidget):
 
         sg.addWidget(QLabel("Symbol:"), 0, 0)
         self._sym_combo = QComboBox()
-        self._sym_combo.setFont(QFont("Arial", 12))
-        for sym, name in GDT_CHARACTERISTICS:
-            self._sym_combo.addItem(f"{sym}  {name}", sym)
-        self._sym_combo.currentIndexChanged.connect(self._update_gdt_preview)
+        self._sym_combo.setFont(_arial(12))
+        self._sym_combo.addItems(_SYM_LABELS)
+        self._sym_combo.currentIndexChanged.connect(self._schedule_gdt_preview)
         sg.addWidget(self._sym_combo, 0, 1, 1, 5)
 
         # Diameter prefix toggle + tolerance value
         self._dia_btn = QPushButton("⌀")
-        self._dia_btn.setFont(QFont("Arial", 12))
+        self._dia_btn.setFont(_arial(12))
         self._dia_btn.setToolTip("Prefix tolerance with ⌀ (diameter symbol)")
         self._dia_btn.setCheckable(True)
         self._dia_btn.setFixedSize(34, 28)
-        self._dia_btn.toggled.connect(self._update_gdt_preview)
+        self._dia_btn.toggled.connect(self._schedule_gdt_preview)
         sg.addWidget(self._dia_btn, 1, 0)
 
         sg.addWidget(QLabel("Tol.:"), 1, 1)
         self._tol_edit = QLineEdit("0.05")
         self._tol_edit.setFixedWidth(70)
-        self._tol_edit.textChanged.connect(self._update_gdt_preview)
+        self._tol_edit.textEdited.connect(self._schedule_gdt_preview)
         sg.addWidget(self._tol_edit, 1, 2)
 
         vl.addWidget(sym_frame)
@@ -194,31 +314,32 @@ class GDTPanelWidget(QDockWidget):
         mg.addWidget(QLabel("Modifiers:"), 0, 0, 1, 4)
 
         self._mod_btns: dict[str, QPushButton] = {}
-        mat_group: list[QPushButton] = []
+        # Material condition buttons are mutually exclusive
+        self._mat_group = QButtonGroup(w)
+        self._mat_group.setExclusive(True)
+        self._mat_group.buttonClicked.connect(self._on_mat_clicked)
+        self._mat_group.buttonToggled.connect(self._on_mat_toggled)
+        self._mat_last: QPushButton | None = None
+        # Active modifiers, kept up to date by the toggled handlers so the
+        # string builder never has to query the buttons.
+        self._active_mat = ""
+        self._zone_flags: dict[str, bool] = {}
+        self._active_zone = ""
 
         for idx, (label, tip, group) in enumerate(MODIFIERS):
             btn = QPushButton(label)
-            btn.setFont(QFont("Arial", 10))
+            btn.setFont(_arial(10))
             btn.setToolTip(tip)
             btn.setCheckable(True)
             btn.setFixedHeight(28)
-            btn.toggled.connect(self._update_gdt_preview)
+            btn.toggled.connect(self._schedule_gdt_preview)
             mg.addWidget(btn, 1 + idx // 4, idx % 4)
             self._mod_btns[label] = btn
             if group == "mat":
-                mat_group.append(btn)
-
-        # Material condition buttons are mutually exclusive
-        def _make_exclusive(me, others):
-            def _h(checked):
-                if checked:
-                    for b in others:
-                        b.setChecked(False)
-            return _h
-
-        for btn in mat_group:
-            others = [b for b in mat_group if b is not btn]
-            btn.toggled.connect(_make_exclusive(btn, others))
+                self._mat_group.addButton(btn)
+            else:
+                self._zone_flags[label] = False
+                btn.toggled.connect(partial(self._on_zone_toggled, label))
 
         vl.addWidget(mod_frame)
 
@@ -230,8 +351,10 @@ class GDTPanelWidget(QDockWidget):
         dg.addWidget(QLabel("Datum references:"), 0, 0, 1, 3)
 
         self._datum_edits: list[QLineEdit] = []
-        bold_f = QFont("Arial", 12)
-        bold_f.setBold(True)
+        # Stripped, upper-cased datum letters, updated as the user types
+        self._datums_norm: list[str] = ["", "", ""]
+        self._datums_nonempty: tuple[str, ...] = ()
+        bold_f = _arial(12, bold=True)
         for col, lbl_text in enumerate(["Primary", "Secondary", "Tertiary"]):
             lbl = QLabel(lbl_text)
             lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -241,7 +364,7 @@ class GDTPanelWidget(QDockWidget):
             edit.setAlignment(Qt.AlignmentFlag.AlignCenter)
             edit.setMaxLength(3)
             edit.setPlaceholderText("–")
-            edit.textChanged.connect(self._update_gdt_preview)
+            edit.textEdited.connect(partial(self._on_datum_edited, col))
             dg.addWidget(edit, 2, col)
             self._datum_edits.append(edit)
 
@@ -250,11 +373,11 @@ class GDTPanelWidget(QDockWidget):
         # ── Live preview ─────────────────────────────────────────────────
         prev_frame = QFrame()
         prev_frame.setFrameShape(QFrame.Shape.StyledPanel)
-        prev_frame.setStyleSheet("QFrame { background:#eef3ff; border-radius:4px; }")
+        prev_frame.setObjectName("preview")
         pfl = QVBoxLayout(prev_frame)
         pfl.setContentsMargins(6, 6, 6, 6)
         self._gdt_preview = QLabel()
-        self._gdt_preview.setFont(QFont("Arial", 12))
+        self._gdt_preview.setFont(_arial(12))
         self._gdt_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._gdt_preview.setWordWrap(True)
         pfl.addWidget(self._gdt_preview)
@@ -265,7 +388,8 @@ class GDTPanelWidget(QDockWidget):
         clr = QPushButton("Clear")
         clr.clicked.connect(self._clear_gdt)
         self._gdt_apply_btn = QPushButton("Enter ✓")
-        self._gdt_apply_btn.setEnabled(False)
+        self._gdt_apply_btn.setEnabled(self._balloon_active)
+        self._apply_btns.append(self._gdt_apply_btn)
         self._gdt_apply_btn.clicked.connect(self._apply_gdt)
         btn_row.addWidget(clr)
         btn_row.addWidget(self._gdt_apply_btn)
@@ -273,6 +397,38 @@ class GDTPanelWidget(QDockWidget):
 
         return w
 
+    def _on_mat_clicked(self, btn: QPushButton):
+        # An exclusive group keeps its button checked when it is clicked
+        # again; treat that second click as "no material condition".
+        if btn is self._mat_last:
+            self._uncheck_mat()
+        else:
+            self._mat_last = btn
+
+    def _on_mat_toggled(self, btn: QPushButton, checked: bool):
+        if checked:
+            self._active_mat = btn.text()
+        elif btn.text() == self._active_mat:
+            self._active_mat = ""
+
+    def _on_zone_toggled(self, label: str, checked: bool):
+        self._zone_flags[label] = checked
+        self._active_zone = "".join(k for k, on in self._zone_flags.items() if on)
+
+    def _on_datum_edited(self, col: int, text: str):
+        self._datums_norm[col] = text.strip().upper()
+        self._datums_nonempty = tuple(d for d in self._datums_norm if d)
+        self._schedule_gdt_preview()
+
+    def _uncheck_mat(self):
+        self._mat_last = None
+        checked = self._mat_group.checkedButton()
+        if checked is not None:
+            # Qt refuses to uncheck the last button of an exclusive group
+            self._mat_group.setExclusive(False)
+            checked.setChecked(False)
+            self._mat_group.setExclusive(True)
+
     # ────────────────────────────────────────────────────────────────────
     # Dimension tab
     # ────────────────────────────────────────────────────────────────────
@@ -290,36 +446,34 @@ class GDTPanelWidget(QDockWidget):
 
         fg.addWidget(QLabel("Type:"), 0, 0)
         self._dim_type_combo = QComboBox()
-        for prefix, name in DIMENSION_TYPES:
-            label = f"{prefix}  {name}" if prefix else name
-            self._dim_type_combo.addItem(label, prefix)
-        self._dim_type_combo.currentIndexChanged.connect(self._update_dim_preview)
+        self._dim_type_combo.addItems(_DIM_TYPE_LABELS)
+        self._dim_type_combo.currentIndexChanged.connect(self._schedule_dim_preview)
         fg.addWidget(self._dim_type_combo, 0, 1, 1, 2)
 
         fg.addWidget(QLabel("Nominal:"), 1, 0)
         self._dim_nominal = QLineEdit("0.000")
-        self._dim_nominal.textChanged.connect(self._update_dim_preview)
+        self._dim_nominal.textEdited.connect(self._schedule_dim_preview)
         fg.addWidget(self._dim_nominal, 1, 1, 1, 2)
 
         fg.addWidget(QLabel("Upper tol.:"), 2, 0)
         self._dim_upper = QLineEdit("+0.000")
-        self._dim_upper.textChanged.connect(self._update_dim_preview)
+        self._dim_upper.textEdited.connect(self._schedule_dim_preview)
         fg.addWidget(self._dim_upper, 2, 1, 1, 2)
 
         fg.addWidget(QLabel("Lower tol.:"), 3, 0)
         self._dim_lower = QLineEdit("-0.000")
-        self._dim_lower.textChanged.connect(self._update_dim_preview)
+        self._dim_lower.textEdited.connect(self._schedule_dim_preview)
         fg.addWidget(self._dim_lower, 3, 1, 1, 2)
 
         vl.addWidget(frm)
 
         prev_frame = QFrame()
         prev_frame.setFrameShape(QFrame.Shape.StyledPanel)
-        prev_frame.setStyleSheet("QFrame { background:#eef3ff; border-radius:4px; }")
+        prev_frame.setObjectName("preview")
         pfl = QVBoxLayout(prev_frame)
         pfl.setContentsMargins(6, 6, 6, 6)
         self._dim_preview = QLabel()
-        self._dim_preview.setFont(QFont("Arial", 12))
+        self._dim_preview.setFont(_arial(12))
         self._dim_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
         pfl.addWidget(self._dim_preview)
         vl.addWidget(prev_frame)
@@ -328,7 +482,8 @@ class GDTPanelWidget(QDockWidget):
         clr = QPushButton("Clear")
         clr.clicked.connect(self._clear_dim)
         self._dim_apply_btn = QPushButton("Enter ✓")
-        self._dim_apply_btn.setEnabled(False)
+        self._dim_apply_btn.setEnabled(self._balloon_active)
+        self._apply_btns.append(self._dim_apply_btn)
         self._dim_apply_btn.clicked.connect(self._apply_dim)
         btn_row.addWidget(clr)
         btn_row.addWidget(self._dim_apply_btn)
@@ -342,66 +497,80 @@ class GDTPanelWidget(QDockWidget):
     # ────────────────────────────────────────────────────────────────────
 
     def _build_gdt_string(self) -> str:
-        sym = self._sym_combo.currentData() or "?"
-        tol = self._tol_edit.text().strip()
-        dia = "⌀" if self._dia_btn.isChecked() else ""
-
-        # Mutually-exclusive material condition modifier
-        mat_mod = ""
-        for key in ("Ⓜ", "Ⓛ", "Ⓢ"):
-            if self._mod_btns.get(key) and self._mod_btns[key].isChecked():
-                mat_mod = key
-                break
-
-        # Independent zone modifiers
-        zone = "".join(
-            key for key in ("F", "T", "P", "ST")
-            if self._mod_btns.get(key) and self._mod_btns[key].isChecked()
+        return _compose_gdt(
+            _SYM_BY_IDX[self._sym_combo.currentIndex()],
+            self._tol_edit.text(),
+            self._dia_btn.isChecked(),
+            self._active_mat,
+            self._active_zone,
+            self._datums_nonempty,
         )
-        zone_str = f"({zone})" if zone else ""
-
-        tol_cell = f"{dia}{tol}{mat_mod}{zone_str}"
-        datums = [e.text().strip().upper() for e in self._datum_edits]
-        parts = [sym, tol_cell] + [d for d in datums if d]
-        return "| " + " | ".join(parts) + " |"
 
     def _build_dim_string(self) -> str:
-        prefix = self._dim_type_combo.currentData() or ""
-        nominal = self._dim_nominal.text().strip()
-        upper = self._dim_upper.text().strip()
-        lower = self._dim_lower.text().strip()
-        # Append degree sign for angular dimensions
-        suffix = "°" if prefix == "∠" else ""
-        s = f"{prefix}{nominal}{suffix}"
-        if upper != "+0.000" or lower != "-0.000":
-            # Bilateral symmetric tolerance
-            if upper.lstrip("+") == lower.lstrip("-"):
-                s += f" ±{upper.lstrip('+')}{suffix}"
-            else:
-                s += f"  {upper}{suffix} / {lower}{suffix}"
-        return s
+        return _compose_dim(
+            _DIM_PREFIX_BY_IDX[self._dim_type_combo.currentIndex()],
+            self._dim_nominal.text(),
+            self._dim_upper.text(),
+            self._dim_lower.text(),
+        )
 
     # ────────────────────────────────────────────────────────────────────
     # Preview updaters
     # ────────────────────────────────────────────────────────────────────
 
+    def _schedule_preview(self, update):
+        self._pending_previews.add(update)
+        self._preview_timer.start()
+
+    def _schedule_gdt_preview(self, *_):
+        self._schedule_preview(self._update_gdt_preview)
+
+    def _schedule_dim_preview(self, *_):
+        self._schedule_preview(self._update_dim_preview)
+
+    def _schedule_surface_preview(self, *_):
+        self._schedule_preview(self._update_surface_preview)
+
+    def _flush_previews(self):
+        pending, self._pending_previews = self._pending_previews, set()
+        for update in pending:
+            update()
+
     def _update_gdt_preview(self):
-        self._gdt_preview.setText(self._build_gdt_string())
+        text = self._build_gdt_string()
+        if text != self._gdt_shown:
+            self._gdt_shown = text
+            self._gdt_preview.setText(text)
 
     def _update_dim_preview(self):
-        self._dim_preview.setText(self._build_dim_string())
+        text = self._build_dim_string()
+        if text != self._dim_shown:
+            self._dim_shown = text
+            self._dim_preview.setText(text)
 
     # ────────────────────────────────────────────────────────────────────
     # Clear
     # ────────────────────────────────────────────────────────────────────
 
     def _clear_gdt(self):
+        # Reset with signals blocked and clear the cached modifier state
+        # directly; the preview is rebuilt once at the end.
+        blockers = [QSignalBlocker(w) for w in
+                    (self._dia_btn, self._mat_group, *self._mod_btns.values())]
         self._tol_edit.setText("0.05")
         self._dia_btn.setChecked(False)
         for btn in self._mod_btns.values():
             btn.setChecked(False)
+        self._uncheck_mat()
+        for blocker in blockers:
+            blocker.unblock()
+        self._active_mat = ""
+        self._zone_flags = dict.fromkeys(self._zone_flags, False)
+        self._active_zone = ""
         for edit in self._datum_edits:
             edit.clear()
+        self._datums_norm = ["", "", ""]
+        self._datums_nonempty = ()
         self._update_gdt_preview()
 
     def _clear_dim(self):
@@ -438,38 +607,35 @@ class GDTPanelWidget(QDockWidget):
 
         sg.addWidget(QLabel("Process:"), 0, 0)
         self._surf_process_combo = QComboBox()
-        self._surf_process_combo.setFont(QFont("Arial", 11))
-        for sym, name in SURFACE_PROCESS:
-            self._surf_process_combo.addItem(f"{sym}  {name}", sym)
-        self._surf_process_combo.currentIndexChanged.connect(self._update_surface_preview)
+        self._surf_process_combo.setFont(_arial(11))
+        self._surf_process_combo.addItems(_SURF_PROCESS_LABELS)
+        self._surf_process_combo.currentIndexChanged.connect(self._schedule_surface_preview)
         sg.addWidget(self._surf_process_combo, 0, 1, 1, 3)
 
         # ── Parameter + value ────────────────────────────────────────────
         sg.addWidget(QLabel("Parameter:"), 1, 0)
         self._surf_param_combo = QComboBox()
-        for p in SURFACE_PARAMS:
-            self._surf_param_combo.addItem(p)
-        self._surf_param_combo.currentIndexChanged.connect(self._update_surface_preview)
+        self._surf_param_combo.addItems(_SURF_PARAM_LABELS)
+        self._surf_param_combo.currentIndexChanged.connect(self._schedule_surface_preview)
         sg.addWidget(self._surf_param_combo, 1, 1)
 
         sg.addWidget(QLabel("Grade:"), 2, 0)
         self._surf_grade_combo = QComboBox()
         self._surf_grade_combo.setFixedWidth(160)
-        for val, label in SURFACE_GRADES:
-            self._surf_grade_combo.addItem(f"{label}" if val else label, val)
+        self._surf_grade_combo.addItems(_SURF_GRADE_LABELS)
         self._surf_grade_combo.currentIndexChanged.connect(self._on_grade_selected)
         sg.addWidget(self._surf_grade_combo, 2, 1, 1, 3)
 
         sg.addWidget(QLabel("Value:"), 3, 0)
         self._surf_value_edit = QLineEdit("0.8")
         self._surf_value_edit.setFixedWidth(70)
-        self._surf_value_edit.textChanged.connect(self._update_surface_preview)
+        self._surf_value_edit.textEdited.connect(self._schedule_surface_preview)
         sg.addWidget(self._surf_value_edit, 3, 1)
 
         sg.addWidget(QLabel("Units:"), 3, 2)
         self._surf_units_combo = QComboBox()
         self._surf_units_combo.addItems(["μm", "μin"])
-        self._surf_units_combo.currentIndexChanged.connect(self._update_surface_preview)
+        self._surf_units_combo.currentIndexChanged.connect(self._schedule_surface_preview)
         sg.addWidget(self._surf_units_combo, 3, 3)
 
         vl.addWidget(sym_frame)
@@ -481,10 +647,9 @@ class GDTPanelWidget(QDockWidget):
         lg.setSpacing(4)
         lg.addWidget(QLabel("Lay direction:"), 0, 0)
         self._surf_lay_combo = QComboBox()
-        self._surf_lay_combo.setFont(QFont("Arial", 11))
-        for sym, name in SURFACE_LAY:
-            self._surf_lay_combo.addItem(name, sym)
-        self._surf_lay_combo.currentIndexChanged.connect(self._update_surface_preview)
+        self._surf_lay_combo.setFont(_arial(11))
+        self._surf_lay_combo.addItems(_SURF_LAY_LABELS)
+        self._surf_lay_combo.currentIndexChanged.connect(self._schedule_surface_preview)
         lg.addWidget(self._surf_lay_combo, 0, 1)
         vl.addWidget(lay_frame)
 
@@ -496,18 +661,18 @@ class GDTPanelWidget(QDockWidget):
         mfl.addWidget(QLabel("Method (opt.):"), 0, 0)
         self._surf_method_edit = QLineEdit()
         self._surf_method_edit.setPlaceholderText("e.g. Ground, Turned, Milled…")
-        self._surf_method_edit.textChanged.connect(self._update_surface_preview)
+        self._surf_method_edit.textEdited.connect(self._schedule_surface_preview)
         mfl.addWidget(self._surf_method_edit, 0, 1)
         vl.addWidget(met_frame)
 
         # ── Live preview ─────────────────────────────────────────────────
         prev_frame = QFrame()
         prev_frame.setFrameShape(QFrame.Shape.StyledPanel)
-        prev_frame.setStyleSheet("QFrame { background:#eef3ff; border-radius:4px; }")
+        prev_frame.setObjectName("preview")
         pfl = QVBoxLayout(prev_frame)
         pfl.setContentsMargins(6, 6, 6, 6)
         self._surf_preview = QLabel()
-        self._surf_preview.setFont(QFont("Arial", 12))
+        self._surf_preview.setFont(_arial(12))
         self._surf_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._surf_preview.setWordWrap(True)
         pfl.addWidget(self._surf_preview)
@@ -518,7 +683,8 @@ class GDTPanelWidget(QDockWidget):
         clr = QPushButton("Clear")
         clr.clicked.connect(self._clear_surface)
         self._surf_apply_btn = QPushButton("Enter ✓")
-        self._surf_apply_btn.setEnabled(False)
+        self._surf_apply_btn.setEnabled(self._balloon_active)
+        self._apply_btns.append(self._surf_apply_btn)
         self._surf_apply_btn.clicked.connect(self._apply_surface)
         btn_row.addWidget(clr)
         btn_row.addWidget(self._surf_apply_btn)
@@ -528,36 +694,37 @@ class GDTPanelWidget(QDockWidget):
         return w
 
     def _on_grade_selected(self, idx: int):
-        val = self._surf_grade_combo.itemData(idx)
+        val = _SURF_GRADE_BY_IDX[idx]
         if val:  # pre-set grade → push value into the line edit
             self._surf_value_edit.setText(val)
-        self._update_surface_preview()
+        self._schedule_surface_preview()
 
     def _build_surface_string(self) -> str:
-        sym   = self._surf_process_combo.currentData() or "√"
-        param = self._surf_param_combo.currentText()
-        value = self._surf_value_edit.text().strip()
-        units = self._surf_units_combo.currentText()
-        lay   = self._surf_lay_combo.currentData() or ""
-        meth  = self._surf_method_edit.text().strip()
-
-        parts = [f"{sym} {param} {value} {units}"]
-        if lay:
-            parts.append(f"Lay: {lay}")
-        if meth:
-            parts.append(meth)
-        return "  |  ".join(parts)
+        return _compose_surface(
+            _SURF_PROCESS_BY_IDX[self._surf_process_combo.currentIndex()],
+            self._surf_param_combo.currentText(),
+            self._surf_value_edit.text(),
+            self._surf_units_combo.currentText(),
+            _SURF_LAY_BY_IDX[self._surf_lay_combo.currentIndex()],
+            self._surf_method_edit.text(),
+        )
 
     def _update_surface_preview(self):
-        self._surf_preview.setText(self._build_surface_string())
+        text = self._build_surface_string()
+        if text != self._surf_shown:
+            self._surf_shown = text
+            self._surf_preview.setText(text)
 
     def _clear_surface(self):
-        self._surf_process_combo.setCurrentIndex(0)
-        self._surf_param_combo.setCurrentIndex(0)
-        self._surf_grade_combo.setCurrentIndex(0)
+        combos = (self._surf_process_combo, self._surf_param_combo,
+                  self._surf_grade_combo, self._surf_units_combo,
+                  self._surf_lay_combo)
+        blockers = [QSignalBlocker(c) for c in combos]
+        for combo in combos:
+            combo.setCurrentIndex(0)
+        for blocker in blockers:
+            blocker.unblock()
         self._surf_value_edit.setText("0.8")
-        self._surf_units_combo.setCurrentIndex(0)
-        self._surf_lay_combo.setCurrentIndex(0)
         self._surf_method_edit.clear()
         self._update_surface_preview()
 
@@ -573,13 +740,13 @@ class GDTPanelWidget(QDockWidget):
         self._current_desc_label.setText(
             f"Current: {description}" if description else ""
         )
-        self._gdt_apply_btn.setEnabled(True)
-        self._dim_apply_btn.setEnabled(True)
-        self._surf_apply_btn.setEnabled(True)
+        self._balloon_active = True
+        for btn in self._apply_btns:
+            btn.setEnabled(True)
 
     def clear_selection(self):
         self._balloon_label.setText("No balloon selected")
         self._current_desc_label.setText("")
-        self._gdt_apply_btn.setEnabled(False)
-        self._dim_apply_btn.setEnabled(False)
-        self._surf_apply_btn.setEnabled(False)
+        self._balloon_active = False
+        for btn in self._apply_btns:
+            btn.setEnabled(False)
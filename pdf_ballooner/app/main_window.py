@@ -1,24 +1,29 @@
 """Main application window: menus, toolbar, undo stack, wiring."""
 from __future__ import annotations
 
+import heapq
 import json
 import os
+from dataclasses import replace
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
-from PyQt6.QtCore import QPointF, Qt, QSize
-from PyQt6.QtGui import QAction, QKeySequence, QUndoStack, QUndoCommand, QIcon
+from PyQt6.QtCore import (
+    QObject, QPointF, QRunnable, Qt, QSignalBlocker, QSize, QThreadPool,
+    QTimer, pyqtSignal,
+)
+from PyQt6.QtGui import QAction, QActionGroup, QKeySequence, QUndoStack, QUndoCommand, QIcon
 from PyQt6.QtWidgets import (
     QMainWindow, QToolBar, QStatusBar, QLabel, QFileDialog,
     QMessageBox, QPushButton, QWidget, QSizePolicy, QSpinBox,
     QComboBox, QDoubleSpinBox,
 )
 
-from app.balloon import BalloonData
+from app.balloon import BalloonData, BalloonStyle
 from app.balloon_table import BalloonTableWidget
 from app.gdt_panel import GDTPanelWidget
 from app.pdf_viewer import PDFViewer, ViewMode
-from app.exporter import export_pdf, export_csv, export_excel
 
 
 # ---------------------------------------------------------------------------
@@ -26,8 +31,11 @@ from app.exporter import export_pdf, export_csv, export_excel
 # ---------------------------------------------------------------------------
 
 class PlaceBalloonCommand(QUndoCommand):
-    def __init__(self, window: "MainWindow", data: BalloonData):
-        super().__init__(f"Place balloon #{data.number}")
+    __slots__ = ("_win", "_data")
+
+    def __init__(self, window: "MainWindow", data: BalloonData,
+                 parent: Optional[QUndoCommand] = None):
+        super().__init__(f"Place balloon #{data.number}", parent)
         self._win = window
         self._data = data
 
@@ -39,8 +47,11 @@ class PlaceBalloonCommand(QUndoCommand):
 
 
 class DeleteBalloonCommand(QUndoCommand):
-    def __init__(self, window: "MainWindow", data: BalloonData):
-        super().__init__(f"Delete balloon #{data.number}")
+    __slots__ = ("_win", "_data")
+
+    def __init__(self, window: "MainWindow", data: BalloonData,
+                 parent: Optional[QUndoCommand] = None):
+        super().__init__(f"Delete balloon #{data.number}", parent)
         self._win = window
         self._data = data
 
@@ -51,23 +62,122 @@ class DeleteBalloonCommand(QUndoCommand):
         self._win._do_add_balloon(self._data)
 
 
+class BulkBalloonCommand(QUndoCommand):
+    """Parent for a group of balloon commands: one undo entry, and the
+    window refreshes its viewer and status bar once per undo/redo."""
+
+    __slots__ = ("_win",)
+
+    def __init__(self, window: "MainWindow", text: str):
+        super().__init__(text)
+        self._win = window
+
+    def redo(self):
+        self._win._begin_bulk()
+        try:
+            super().redo()
+        finally:
+            self._win._end_bulk()
+
+    def undo(self):
+        self._win._begin_bulk()
+        try:
+            super().undo()
+        finally:
+            self._win._end_bulk()
+
+
 class MoveBalloonCommand(QUndoCommand):
+    """Shift a balloon by a fixed offset (PDF points); undo shifts it back."""
+
+    __slots__ = ("_win", "_uid", "_dx_c", "_dy_c", "_dx_t", "_dy_t")
+
     def __init__(self, window: "MainWindow", uid: str,
-                 old_center: QPointF, new_center: QPointF,
-                 old_target: QPointF, new_target: QPointF):
+                 dx_center: float, dy_center: float,
+                 dx_target: float = 0.0, dy_target: float = 0.0):
         super().__init__("Move balloon")
         self._win = window
         self._uid = uid
-        self._old_center = old_center
-        self._new_center = new_center
-        self._old_target = old_target
-        self._new_target = new_target
+        self._dx_c = dx_center
+        self._dy_c = dy_center
+        self._dx_t = dx_target
+        self._dy_t = dy_target
+        # A zero move is discarded by QUndoStack.push instead of stored
+        self.setObsolete(not (dx_center or dy_center or dx_target or dy_target))
+
+    ID = 1001
+
+    def id(self) -> int:
+        return self.ID
+
+    def mergeWith(self, other: QUndoCommand) -> bool:
+        """Fold consecutive moves of the same balloon into one entry."""
+        if not isinstance(other, MoveBalloonCommand) or other._uid != self._uid:
+            return False
+        self._dx_c += other._dx_c
+        self._dy_c += other._dy_c
+        self._dx_t += other._dx_t
+        self._dy_t += other._dy_t
+        # Moved back to where it started: let the stack drop the entry
+        self.setObsolete(not (self._dx_c or self._dy_c or self._dx_t or self._dy_t))
+        return True
 
     def redo(self):
-        self._win._do_move_balloon(self._uid, self._new_center, self._new_target)
+        self._win._do_shift_balloon(self._uid, self._dx_c, self._dy_c,
+                                    self._dx_t, self._dy_t)
 
     def undo(self):
-        self._win._do_move_balloon(self._uid, self._old_center, self._old_target)
+        self._win._do_shift_balloon(self._uid, -self._dx_c, -self._dy_c,
+                                    -self._dx_t, -self._dy_t)
+
+
+# ---------------------------------------------------------------------------
+# Background export
+# ---------------------------------------------------------------------------
+
+class _ExportSignals(QObject):
+    done = pyqtSignal(str)     # destination path
+    failed = pyqtSignal(str)   # error message
+
+
+class _ExportJob(QRunnable):
+    """Run ``fn(path, *args)`` on the global thread pool.
+
+    Only used for the CSV/Excel writers: MuPDF's context is not safe to
+    share with the viewer's rendering, so PDF export stays on the GUI thread.
+    """
+
+    def __init__(self, fn, path: str, *args):
+        super().__init__()
+        self._fn = fn
+        self._path = path
+        self._args = args
+        self.signals = _ExportSignals()
+
+    def run(self):
+        try:
+            self._fn(self._path, *self._args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.done.emit(self._path)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+# Circle offset from the click point for styles that draw a leader
+_LEADER_OFFSET = QPointF(40.0, 40.0)
+
+# Oldest undo steps are dropped beyond this (0 = unlimited)
+_UNDO_LIMIT = int(os.environ.get("BALLOONER_UNDO_LIMIT", "200"))
+
+
+def _reading_order_key(b: BalloonData) -> tuple[int, float, float]:
+    """Sort key for renumbering: page, then top-to-bottom, then left-to-right."""
+    c = b.balloon_center
+    return b.page, -c.y(), c.x()
 
 
 # ---------------------------------------------------------------------------
@@ -81,15 +191,33 @@ class MainWindow(QMainWindow):
         self.resize(1280, 900)
 
         self._undo_stack = QUndoStack(self)
+        self._undo_stack.setUndoLimit(_UNDO_LIMIT)
+        self._bulk_depth = 0   # > 0 while a BulkBalloonCommand is running
+        self._export_job: Optional[_ExportJob] = None   # CSV/Excel in flight
+        # One message box per icon, built on first use and then reused
+        self._msg_boxes: dict[QMessageBox.Icon, QMessageBox] = {}
         self._pdf_path: str = ""
+        self._pdf_file: Optional[Path] = None   # parsed once per open_pdf
         self._balloons: dict[str, BalloonData] = {}
+        # Free-number bookkeeping: every unused number below the cursor is
+        # in the heap (entries that were taken again are dropped lazily).
+        self._number_counts: dict[int, int] = {}
+        self._free_numbers: list[int] = []
+        self._number_cursor = 1
         self._move_origin: dict[str, tuple[QPointF, QPointF]] = {}
 
+        # Table rows touched by drags/edits, flushed at most once a frame
+        self._dirty_uids: set[str] = set()
+        self._table_flush_timer = QTimer(self)
+        self._table_flush_timer.setSingleShot(True)
+        self._table_flush_timer.setInterval(16)
+        self._table_flush_timer.timeout.connect(self._flush_table_updates)
+
         # Currently selected balloon (for the GD&T description builder)
         self._selected_balloon_uid: str = ""
 
         # Balloon style defaults for newly placed balloons
-        self._default_style: str = "default"
+        self._default_style: BalloonStyle = BalloonStyle.DEFAULT
         self._default_diameter: float = 36.0
         self._default_font_size: float = 0.0  # 0 = auto
 
@@ -114,6 +242,18 @@ class MainWindow(QMainWindow):
         sb.addPermanentWidget(self._status_zoom)
         sb.addPermanentWidget(self._status_count)
         self.setStatusBar(sb)
+        # Last values shown, so repeated signals skip the re-format/repaint
+        self._last_page: tuple[int, int] = (-1, -1)
+        self._syncing_page_spin = False   # set while the spin mirrors the viewer
+        self._last_zoom_pct: int = 100
+        self._last_count: int = 0
+        self._count_dirty = False
+        # Wheel zoom fires per notch; the label follows at most every 30 ms
+        self._pending_zoom = 1.0
+        self._zoom_label_timer = QTimer(self)
+        self._zoom_label_timer.setSingleShot(True)
+        self._zoom_label_timer.setInterval(30)
+        self._zoom_label_timer.timeout.connect(self._flush_zoom_label)
 
         self._build_menus()
         self._build_toolbar()
@@ -165,42 +305,61 @@ class MainWindow(QMainWindow):
         edit_menu.addAction(undo_act)
         edit_menu.addAction(redo_act)
         edit_menu.addSeparator()
-        edit_menu.addAction(QAction("&Renumber All Balloons", self,
-                                     triggered=self._renumber_balloons))
+        # Actions shared by a menu and a toolbar carry a short icon text
+        # for the toolbar button.
+        self._act_renumber = QAction("&Renumber All Balloons", self,
+                                     triggered=self._renumber_balloons)
+        self._act_renumber.setIconText("Renumber")
+        edit_menu.addAction(self._act_renumber)
 
         # View
         view_menu = mb.addMenu("&View")
-        view_menu.addAction(QAction("Zoom &In", self, shortcut="Ctrl++",
-                                     triggered=self._viewer.zoom_in))
-        view_menu.addAction(QAction("Zoom &Out", self, shortcut="Ctrl+-",
-                                     triggered=self._viewer.zoom_out))
-        view_menu.addAction(QAction("&Fit to Page", self, shortcut="Ctrl+0",
-                                     triggered=self._viewer.fit_to_page))
+        self._act_zoom_in = QAction("Zoom &In", self, shortcut="Ctrl++",
+                                    triggered=self._viewer.zoom_in)
+        self._act_zoom_in.setIconText("+")
+        view_menu.addAction(self._act_zoom_in)
+        self._act_zoom_out = QAction("Zoom &Out", self, shortcut="Ctrl+-",
+                                     triggered=self._viewer.zoom_out)
+        self._act_zoom_out.setIconText("−")
+        view_menu.addAction(self._act_zoom_out)
+        self._act_fit_page = QAction("&Fit to Page", self, shortcut="Ctrl+0",
+                                     triggered=self._viewer.fit_to_page)
+        self._act_fit_page.setIconText("Fit")
+        view_menu.addAction(self._act_fit_page)
         view_menu.addAction(QAction("Fit to &Width", self,
                                      triggered=self._viewer.fit_to_width))
         view_menu.addSeparator()
-        view_menu.addAction(QAction("Rotate Page &Clockwise", self, shortcut="Ctrl+]",
-                                     triggered=self._viewer.rotate_page_cw))
-        view_menu.addAction(QAction("Rotate Page &Counter-Clockwise", self, shortcut="Ctrl+[",
-                                     triggered=self._viewer.rotate_page_ccw))
+        self._act_rotate_cw = QAction("Rotate Page &Clockwise", self, shortcut="Ctrl+]",
+                                      triggered=self._viewer.rotate_page_cw)
+        self._act_rotate_cw.setIconText("↻ CW")
+        view_menu.addAction(self._act_rotate_cw)
+        self._act_rotate_ccw = QAction("Rotate Page &Counter-Clockwise", self, shortcut="Ctrl+[",
+                                       triggered=self._viewer.rotate_page_ccw)
+        self._act_rotate_ccw.setIconText("↺ CCW")
+        view_menu.addAction(self._act_rotate_ccw)
 
         # Tools
         tools_menu = mb.addMenu("&Tools")
         self._act_nav_mode = QAction("&Navigate Mode", self, checkable=True,
                                       shortcut="Escape")
         self._act_nav_mode.setChecked(True)
-        self._act_nav_mode.triggered.connect(lambda: self._set_mode(ViewMode.NAVIGATE))
-        tools_menu.addAction(self._act_nav_mode)
-
         self._act_bal_mode = QAction("&Balloon Mode", self, checkable=True,
                                       shortcut="B")
-        self._act_bal_mode.triggered.connect(lambda: self._set_mode(ViewMode.BALLOON))
-        tools_menu.addAction(self._act_bal_mode)
-
         self._act_move_mode = QAction("&Move Balloon Mode", self, checkable=True,
                                        shortcut="M")
-        self._act_move_mode.triggered.connect(lambda: self._set_mode(ViewMode.MOVE))
-        tools_menu.addAction(self._act_move_mode)
+
+        # The exclusive group keeps exactly one mode action checked
+        self._mode_actions: dict[ViewMode, QAction] = {
+            ViewMode.NAVIGATE: self._act_nav_mode,
+            ViewMode.BALLOON:  self._act_bal_mode,
+            ViewMode.MOVE:     self._act_move_mode,
+        }
+        self._action_modes = {act: mode for mode, act in self._mode_actions.items()}
+        self._mode_group = QActionGroup(self)
+        for act in self._mode_actions.values():
+            self._mode_group.addAction(act)
+            tools_menu.addAction(act)
+        self._mode_group.triggered.connect(self._on_mode_action)
 
     def _build_toolbar(self):
         tb = QToolBar("Main Toolbar")
@@ -212,9 +371,9 @@ class MainWindow(QMainWindow):
         tb.addAction(self._act_save)
         tb.addSeparator()
 
-        tb.addAction(QAction("−", self, triggered=self._viewer.zoom_out))
-        tb.addAction(QAction("+", self, triggered=self._viewer.zoom_in))
-        tb.addAction(QAction("Fit", self, triggered=self._viewer.fit_to_page))
+        tb.addAction(self._act_zoom_out)
+        tb.addAction(self._act_zoom_in)
+        tb.addAction(self._act_fit_page)
         tb.addSeparator()
 
         tb.addAction(QAction("◄", self, triggered=self._viewer.prev_page))
@@ -222,13 +381,13 @@ class MainWindow(QMainWindow):
         self._page_spin.setMinimum(1)
         self._page_spin.setMaximum(1)
         self._page_spin.setFixedWidth(55)
-        self._page_spin.valueChanged.connect(lambda v: self._viewer.set_page(v - 1))
+        self._page_spin.valueChanged.connect(self._on_page_spin_changed)
         tb.addWidget(self._page_spin)
         tb.addAction(QAction("►", self, triggered=self._viewer.next_page))
         tb.addSeparator()
 
-        tb.addAction(QAction("↻ CW", self, triggered=self._viewer.rotate_page_cw))
-        tb.addAction(QAction("↺ CCW", self, triggered=self._viewer.rotate_page_ccw))
+        tb.addAction(self._act_rotate_cw)
+        tb.addAction(self._act_rotate_ccw)
         tb.addSeparator()
 
         self._btn_balloon = QPushButton("Balloon")
@@ -285,8 +444,7 @@ class MainWindow(QMainWindow):
         opt_tb.addWidget(self._font_spin)
 
         opt_tb.addSeparator()
-        opt_tb.addAction(QAction("Renumber", self,
-                                  triggered=self._renumber_balloons))
+        opt_tb.addAction(self._act_renumber)
 
     # ------------------------------------------------------------------
     # Signal wiring
@@ -296,6 +454,7 @@ class MainWindow(QMainWindow):
         self._viewer.balloon_requested.connect(self._on_balloon_requested)
         self._viewer.balloon_moved.connect(self._on_balloon_moved)
         self._viewer.balloon_deleted.connect(self._on_balloon_deleted)
+        self._viewer.balloons_deleted.connect(self.delete_balloons)
         self._viewer.balloon_desc_changed.connect(self._on_balloon_desc_changed)
         self._viewer.balloon_num_changed.connect(self._on_balloon_num_changed)
         self._viewer.page_changed.connect(self._on_page_changed)
@@ -315,149 +474,202 @@ class MainWindow(QMainWindow):
         self._viewer.set_mode(mode)
         for btn, target in ((self._btn_balloon, ViewMode.BALLOON),
                             (self._btn_move, ViewMode.MOVE)):
-            btn.blockSignals(True)
-            btn.setChecked(mode == target)
-            btn.blockSignals(False)
-        self._act_nav_mode.setChecked(mode == ViewMode.NAVIGATE)
-        self._act_bal_mode.setChecked(mode == ViewMode.BALLOON)
-        self._act_move_mode.setChecked(mode == ViewMode.MOVE)
+            with QSignalBlocker(btn):
+                btn.setChecked(mode == target)
+        self._mode_actions[mode].setChecked(True)
+
+    def _on_mode_action(self, action: QAction):
+        self._set_mode(self._action_modes[action])
 
     def _on_balloon_btn_toggled(self, checked: bool):
-        if checked:
-            self._btn_move.blockSignals(True)
-            self._btn_move.setChecked(False)
-            self._btn_move.blockSignals(False)
-        self._viewer.set_mode(ViewMode.BALLOON if checked else ViewMode.NAVIGATE)
-        self._act_nav_mode.setChecked(not checked)
-        self._act_bal_mode.setChecked(checked)
-        self._act_move_mode.setChecked(False)
+        self._set_mode(ViewMode.BALLOON if checked else ViewMode.NAVIGATE)
 
     def _on_move_btn_toggled(self, checked: bool):
-        if checked:
-            self._btn_balloon.blockSignals(True)
-            self._btn_balloon.setChecked(False)
-            self._btn_balloon.blockSignals(False)
-        self._viewer.set_mode(ViewMode.MOVE if checked else ViewMode.NAVIGATE)
-        self._act_nav_mode.setChecked(not checked)
-        self._act_bal_mode.setChecked(False)
-        self._act_move_mode.setChecked(checked)
+        self._set_mode(ViewMode.MOVE if checked else ViewMode.NAVIGATE)
 
     # ------------------------------------------------------------------
     # File operations
     # ------------------------------------------------------------------
 
-    def open_pdf(self):
+    # Skip per-entry custom icon lookups while a directory is listed.
+    _DIALOG_OPTIONS = QFileDialog.Option.DontUseCustomDirectoryIcons
+
+    def _message_box(self, icon: QMessageBox.Icon, title: str, text: str,
+                     buttons=QMessageBox.StandardButton.Ok) -> QMessageBox.StandardButton:
+        box = self._msg_boxes.get(icon)
+        if box is None:
+            box = self._msg_boxes[icon] = QMessageBox(self)
+            box.setIcon(icon)
+        box.setWindowTitle(title)
+        box.setText(text)
+        box.setStandardButtons(buttons)
+        return QMessageBox.StandardButton(box.exec())
+
+    def _info(self, title: str, text: str):
+        self._message_box(QMessageBox.Icon.Information, title, text)
+
+    def _warn(self, title: str, text: str):
+        self._message_box(QMessageBox.Icon.Warning, title, text)
+
+    def _error(self, title: str, text: str):
+        self._message_box(QMessageBox.Icon.Critical, title, text)
+
+    def _ask(self, title: str, text: str) -> bool:
+        reply = self._message_box(
+            QMessageBox.Icon.Question, title, text,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        return reply == QMessageBox.StandardButton.Yes
+
+    def _open_file(self, caption: str, filt: str, default: str = "") -> str:
         path, _ = QFileDialog.getOpenFileName(
-            self, "Open PDF", "", "PDF Files (*.pdf)"
+            self, caption, default, filt, options=self._DIALOG_OPTIONS
         )
+        return path
+
+    def _save_file(self, caption: str, filt: str, default: str = "") -> str:
+        path, _ = QFileDialog.getSaveFileName(
+            self, caption, default, filt, options=self._DIALOG_OPTIONS
+        )
+        return path
+
+    def open_pdf(self):
+        path = self._open_file("Open PDF", "PDF Files (*.pdf)")
         if not path:
             return
         self._pdf_path = path
+        self._pdf_file = Path(path)
         self._balloons.clear()
+        self._reset_numbers()
         self._selected_balloon_uid = ""
         self._gdt_panel.clear_selection()
         self._undo_stack.clear()
         self._table.clear_all()
         self._viewer.load_pdf(path)
-        self.setWindowTitle(f"PDF Ballooner — {Path(path).name}")
-
-        sidecar = Path(path).with_suffix(".balloons.json")
-        if sidecar.exists():
-            reply = QMessageBox.question(
-                self, "Load Session",
-                f"Found balloon session file:\n{sidecar}\n\nLoad it?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-            )
-            if reply == QMessageBox.StandardButton.Yes:
-                self._load_sidecar(sidecar)
+        self.setWindowTitle(f"PDF Ballooner — {self._pdf_file.name}")
+
+        sidecar = self._pdf_file.with_suffix(".balloons.json")
+        if sidecar.is_file():
+            # Let the first page paint before the modal prompt takes over
+            QTimer.singleShot(0, partial(self._maybe_load_sidecar, sidecar))
+
+    def _maybe_load_sidecar(self, sidecar: Path):
+        if self._pdf_file is None or sidecar != self._pdf_file.with_suffix(".balloons.json"):
+            return   # another PDF was opened in the meantime
+        if self._ask("Load Session",
+                     f"Found balloon session file:\n{sidecar}\n\nLoad it?"):
+            self._load_sidecar(sidecar)
 
     def export_pdf(self):
         if not self._pdf_path:
-            QMessageBox.warning(self, "No PDF", "Open a PDF first.")
+            self._warn("No PDF", "Open a PDF first.")
             return
-        default = str(Path(self._pdf_path).with_stem(
-            Path(self._pdf_path).stem + "_ballooned"
-        ))
-        path, _ = QFileDialog.getSaveFileName(
-            self, "Export Ballooned PDF", default, "PDF Files (*.pdf)"
-        )
+        pdf_file = self._pdf_file
+        default = str(pdf_file.with_stem(pdf_file.stem + "_ballooned"))
+        path = self._save_file("Export Ballooned PDF", "PDF Files (*.pdf)", default)
         if not path:
             return
+        from app import exporter  # deferred until the first export
         try:
-            export_pdf(self._pdf_path, path, list(self._balloons.values()),
-                       self._viewer._page_rotations)
-            QMessageBox.information(self, "Done", f"Saved to:\n{path}")
+            exporter.export_pdf(self._pdf_path, path, self._balloons.values(),
+                                self._viewer._page_rotations)
+            self._info("Done", f"Saved to:\n{path}")
         except Exception as e:
-            QMessageBox.critical(self, "Export Error", str(e))
+            self._error("Export Error", str(e))
 
     def export_csv(self):
         if not self._balloons:
-            QMessageBox.information(self, "No Balloons", "No balloons to export.")
+            self._info("No Balloons", "No balloons to export.")
             return
-        default = str(Path(self._pdf_path).with_suffix(".csv")) if self._pdf_path else "balloons.csv"
-        path, _ = QFileDialog.getSaveFileName(
-            self, "Export Balloon List", default, "CSV Files (*.csv)"
-        )
+        default = str(self._pdf_file.with_suffix(".csv")) if self._pdf_file else "balloons.csv"
+        path = self._save_file("Export Balloon List", "CSV Files (*.csv)", default)
         if not path:
             return
-        try:
-            export_csv(path, list(self._balloons.values()))
-            QMessageBox.information(self, "Done", f"Saved to:\n{path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", str(e))
+        from app import exporter
+        self._start_export(exporter.export_csv, path, self._snapshot_balloons())
 
     def export_excel_sheet(self):
         if not self._balloons:
-            QMessageBox.information(self, "No Balloons", "No balloons to export.")
+            self._info("No Balloons", "No balloons to export.")
             return
-        default = str(Path(self._pdf_path).with_suffix(".xlsx")) if self._pdf_path else "inspection.xlsx"
-        path, _ = QFileDialog.getSaveFileName(
-            self, "Export Inspection Sheet", default, "Excel Files (*.xlsx)"
-        )
+        default = str(self._pdf_file.with_suffix(".xlsx")) if self._pdf_file else "inspection.xlsx"
+        path = self._save_file("Export Inspection Sheet", "Excel Files (*.xlsx)", default)
         if not path:
             return
-        try:
-            drawing_name = Path(self._pdf_path).stem if self._pdf_path else ""
-            export_excel(path, list(self._balloons.values()), drawing_name)
-            QMessageBox.information(self, "Done", f"Saved to:\n{path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", str(e))
+        from app import exporter
+        drawing_name = self._pdf_file.stem if self._pdf_file else ""
+        self._start_export(exporter.export_excel, path,
+                           self._snapshot_balloons(), drawing_name)
+
+    def _snapshot_balloons(self) -> list[BalloonData]:
+        """Copies safe to hand to a worker thread (drags mutate points in place)."""
+        return [replace(b, target_point=QPointF(b.target_point),
+                        balloon_center=QPointF(b.balloon_center))
+                for b in self._balloons.values()]
+
+    def _start_export(self, fn, path: str, *args):
+        job = _ExportJob(fn, path, *args)
+        job.signals.done.connect(self._on_export_done)
+        job.signals.failed.connect(self._on_export_failed)
+        self._export_job = job
+        self._act_csv.setEnabled(False)
+        self._act_excel.setEnabled(False)
+        QThreadPool.globalInstance().start(job)
+
+    def _end_export(self):
+        self._export_job = None
+        self._act_csv.setEnabled(True)
+        self._act_excel.setEnabled(True)
+
+    def _on_export_done(self, path: str):
+        self._end_export()
+        self._info("Done", f"Saved to:\n{path}")
+
+    def _on_export_failed(self, message: str):
+        self._end_export()
+        self._error("Export Error", message)
 
     def save_session(self):
         if not self._pdf_path:
-            QMessageBox.warning(self, "No PDF", "Open a PDF first.")
+            self._warn("No PDF", "Open a PDF first.")
             return
-        default = str(Path(self._pdf_path).with_suffix(".balloons.json"))
-        path, _ = QFileDialog.getSaveFileName(
-            self, "Save Session", default, "JSON Files (*.json)"
-        )
+        default = str(self._pdf_file.with_suffix(".balloons.json"))
+        path = self._save_file("Save Session", "JSON Files (*.json)", default)
         if not path:
             return
         data = {
             "pdf": self._pdf_path,
             "balloons": [b.to_dict() for b in self._balloons.values()],
         }
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
-        QMessageBox.information(self, "Saved", f"Session saved to:\n{path}")
+        # Compact separators keep json on its C encoder (indent forces the
+        # pure-Python one); the whole document goes out in one write, to a
+        # temp file that replaces the target only once it is complete.
+        tmp = path + ".tmp"
+        try:
+            Path(tmp).write_text(json.dumps(data, separators=(",", ":")),
+                                 encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            self._error("Save Error", str(e))
+            return
+        self._info("Saved", f"Session saved to:\n{path}")
 
     def load_session(self):
-        path, _ = QFileDialog.getOpenFileName(
-            self, "Load Session", "", "JSON Files (*.json)"
-        )
+        path = self._open_file("Load Session", "JSON Files (*.json)")
         if not path:
             return
         self._load_sidecar(Path(path))
 
     def _load_sidecar(self, path: Path):
         try:
-            with open(path) as f:
-                raw = json.load(f)
-            for d in raw.get("balloons", []):
-                data = BalloonData.from_dict(d)
-                self._do_add_balloon(data)
+            raw = json.loads(Path(path).read_bytes())
+            self._do_add_balloons(
+                [BalloonData.from_dict(d) for d in raw.get("balloons", [])]
+            )
         except Exception as e:
-            QMessageBox.critical(self, "Load Error", str(e))
+            self._error("Load Error", str(e))
 
     # ------------------------------------------------------------------
     # Balloon operations
@@ -465,25 +677,76 @@ class MainWindow(QMainWindow):
 
     def _do_add_balloon(self, data: BalloonData):
         self._balloons[data.uid] = data
+        self._claim_number(data.number)
         self._viewer.add_balloon(data)
         self._table.add_balloon(data)
         self._update_count()
 
+    def _do_add_balloons(self, datas: list[BalloonData]):
+        """Bulk variant of _do_add_balloon: one repaint, one table reset."""
+        if not datas:
+            return
+        for data in datas:
+            self._balloons[data.uid] = data
+        self._viewer.add_balloons(datas)
+        self._reset_numbers()
+        self._table.set_balloons(self._balloons.values())
+        self._update_count()
+
     def _do_remove_balloon(self, uid: str):
         if uid == self._selected_balloon_uid:
             self._selected_balloon_uid = ""
             self._gdt_panel.clear_selection()
-        self._balloons.pop(uid, None)
+        data = self._balloons.pop(uid, None)
+        if data is not None:
+            self._release_number(data.number)
         self._viewer.remove_balloon(uid)
         self._table.remove_balloon(uid)
         self._update_count()
 
-    def _do_move_balloon(self, uid: str, new_center: QPointF, new_target: QPointF):
+    def place_balloons(self, datas: list[BalloonData]):
+        """Place several balloons as a single undoable step."""
+        if not datas:
+            return
+        parent = BulkBalloonCommand(self, f"Place {len(datas)} balloons")
+        for data in datas:
+            PlaceBalloonCommand(self, data, parent)
+        self._undo_stack.push(parent)
+
+    def delete_balloons(self, uids: list[str]):
+        """Delete several balloons as a single undoable step."""
+        datas = [self._balloons[uid] for uid in uids if uid in self._balloons]
+        if not datas:
+            return
+        if len(datas) == 1:
+            self._undo_stack.push(DeleteBalloonCommand(self, datas[0]))
+            return
+        parent = BulkBalloonCommand(self, f"Delete {len(datas)} balloons")
+        for data in datas:
+            DeleteBalloonCommand(self, data, parent)
+        self._undo_stack.push(parent)
+
+    def _begin_bulk(self):
+        if not self._bulk_depth:
+            self._viewer.setUpdatesEnabled(False)
+        self._bulk_depth += 1
+
+    def _end_bulk(self):
+        self._bulk_depth -= 1
+        if not self._bulk_depth:
+            self._viewer.setUpdatesEnabled(True)
+            self._update_count()
+
+    def _do_shift_balloon(self, uid: str, dx_c: float, dy_c: float,
+                          dx_t: float, dy_t: float):
+        if not (dx_c or dy_c or dx_t or dy_t):
+            return
         data = self._balloons.get(uid)
         if not data:
             return
-        data.balloon_center = new_center
-        data.target_point = new_target
+        c, t = data.balloon_center, data.target_point
+        data.balloon_center = QPointF(c.x() + dx_c, c.y() + dy_c)
+        data.target_point = QPointF(t.x() + dx_t, t.y() + dy_t)
         self._viewer.update_balloon(data)
         self._table.update_balloon(data)
 
@@ -493,29 +756,55 @@ class MainWindow(QMainWindow):
 
     def _next_free_number(self) -> int:
         """Return the lowest positive integer not currently used by any balloon."""
-        used = {b.number for b in self._balloons.values()}
-        n = 1
-        while n in used:
-            n += 1
-        return n
+        counts, heap = self._number_counts, self._free_numbers
+        while heap and heap[0] in counts:
+            heapq.heappop(heap)
+        if heap:
+            return heap[0]
+        while self._number_cursor in counts:
+            self._number_cursor += 1
+        return self._number_cursor
+
+    def _claim_number(self, n: int):
+        self._number_counts[n] = self._number_counts.get(n, 0) + 1
+        while self._number_cursor in self._number_counts:
+            self._number_cursor += 1
+
+    def _release_number(self, n: int):
+        count = self._number_counts.get(n, 0)
+        if count > 1:
+            self._number_counts[n] = count - 1
+            return
+        self._number_counts.pop(n, None)
+        if n < self._number_cursor:
+            heapq.heappush(self._free_numbers, n)
+
+    def _reset_numbers(self):
+        """Rebuild the free-number bookkeeping from the current balloons."""
+        self._number_counts = {}
+        for b in self._balloons.values():
+            self._number_counts[b.number] = self._number_counts.get(b.number, 0) + 1
+        self._free_numbers = []
+        self._number_cursor = 1
+        while self._number_cursor in self._number_counts:
+            self._number_cursor += 1
 
     def _renumber_balloons(self):
         """Renumber all balloons sequentially sorted by page → top-to-bottom."""
         if not self._balloons:
             return
-        sorted_bs = sorted(
-            self._balloons.values(),
-            key=lambda b: (b.page, -b.balloon_center.y(), b.balloon_center.x()),
-        )
+        sorted_bs = sorted(self._balloons.values(), key=_reading_order_key)
         for i, b in enumerate(sorted_bs, 1):
             b.number = i
-            item = self._viewer._balloon_items.get(b.uid)
-            if item:
-                item.set_number(i)
-        # Rebuild table in one pass
-        self._table.clear_all()
-        for b in sorted(self._balloons.values(), key=lambda b: (b.page, b.number)):
-            self._table.add_balloon(b)
+        # Only the current page has scene items; walk those instead of
+        # probing the viewer once per balloon.
+        balloons = self._balloons
+        for uid, item in self._viewer.balloon_items():
+            item.set_number(balloons[uid].number)
+        self._reset_numbers()
+        # Page is the leading sort key and numbers follow the list, so the
+        # geometric order is already the table's (page, number) order.
+        self._table.set_balloons(sorted_bs, presorted=True)
         # Refresh GD&T panel if the renumbered balloon is selected
         if self._selected_balloon_uid:
             data = self._balloons.get(self._selected_balloon_uid)
@@ -527,8 +816,8 @@ class MainWindow(QMainWindow):
     # ------------------------------------------------------------------
 
     def _on_style_changed(self, idx: int):
-        styles = ["default", "red", "outline", "no_arrow"]
-        self._default_style = styles[idx]
+        # Combo entries are listed in BalloonStyle order
+        self._default_style = BalloonStyle(idx)
 
     def _on_size_changed(self, value: float):
         self._default_diameter = value
@@ -539,10 +828,10 @@ class MainWindow(QMainWindow):
     def _on_balloon_requested(self, target_pdf: QPointF, page: int):
         # For no-arrow style the circle sits exactly at the click point.
         # For styles with a leader the circle is offset so the arrow has room.
-        if self._default_style == "no_arrow":
-            center_pdf = target_pdf
+        if self._default_style is BalloonStyle.NO_ARROW:
+            center_pdf = QPointF(target_pdf)   # own copy; dragging mutates it
         else:
-            center_pdf = QPointF(target_pdf.x() + 40, target_pdf.y() + 40)
+            center_pdf = target_pdf + _LEADER_OFFSET   # new QPointF
         data = BalloonData(
             number=self._next_free_number(),
             page=page,
@@ -556,9 +845,20 @@ class MainWindow(QMainWindow):
         self._undo_stack.push(cmd)
 
     def _on_balloon_moved(self, uid: str, new_center: QPointF, new_target: QPointF):
-        data = self._balloons.get(uid)
-        if data:
-            self._table.update_balloon(data)
+        if uid in self._balloons:
+            self._mark_table_dirty(uid)
+
+    def _mark_table_dirty(self, uid: str):
+        self._dirty_uids.add(uid)
+        if not self._table_flush_timer.isActive():
+            self._table_flush_timer.start()
+
+    def _flush_table_updates(self):
+        dirty, self._dirty_uids = self._dirty_uids, set()
+        for uid in dirty:
+            data = self._balloons.get(uid)   # may have been deleted since
+            if data:
+                self._table.update_balloon(data)
 
     def _on_balloon_deleted(self, uid: str):
         data = self._balloons.get(uid)
@@ -571,7 +871,7 @@ class MainWindow(QMainWindow):
         data = self._balloons.get(uid)
         if data:
             data.description = desc
-            self._table.update_balloon(data)
+            self._mark_table_dirty(uid)
             # Keep GD&T panel in sync if this balloon is selected
             if uid == self._selected_balloon_uid:
                 self._gdt_panel.set_balloon(data.number, desc)
@@ -579,7 +879,12 @@ class MainWindow(QMainWindow):
     def _on_balloon_num_changed(self, uid: str, num: int):
         data = self._balloons.get(uid)
         if data:
+            self._release_number(data.number)
             data.number = num
+            self._claim_number(num)
+            item = self._viewer.balloon_item(uid)
+            if item is not None:
+                item.set_number(num)
             self._table.update_balloon(data)
 
     def _on_balloon_selected(self, uid: str):
@@ -597,19 +902,58 @@ class MainWindow(QMainWindow):
             return
         data.description = desc
         self._table.update_balloon(data)
-        item = self._viewer._balloon_items.get(uid)
+        item = self._viewer.balloon_item(uid)
         if item:
             item.set_description(desc)
 
+    def _on_page_spin_changed(self, value: int):
+        if not self._syncing_page_spin:
+            self._viewer.set_page(value - 1)
+
     def _on_page_changed(self, current: int, total: int):
+        # The spin box is kept in step with _last_page, so an unchanged
+        # pair means there is nothing to do at all.
+        last_current, last_total = self._last_page
+        if (current, total) == (last_current, last_total):
+            return
+        self._last_page = (current, total)
         self._status_page.setText(f"Page {current + 1} / {total}")
-        self._page_spin.blockSignals(True)
-        self._page_spin.setMaximum(total)
-        self._page_spin.setValue(current + 1)
-        self._page_spin.blockSignals(False)
+        spin = self._page_spin
+        self._syncing_page_spin = True
+        try:
+            if total != last_total:
+                spin.setMaximum(total)
+            if spin.value() != current + 1:
+                spin.setValue(current + 1)
+        finally:
+            self._syncing_page_spin = False
 
     def _on_zoom_changed(self, zoom: float):
-        self._status_zoom.setText(f"Zoom: {int(zoom * 100)}%")
+        self._pending_zoom = zoom
+        if not self._zoom_label_timer.isActive():
+            self._zoom_label_timer.start()
+
+    def _flush_zoom_label(self):
+        pct = int(self._pending_zoom * 100)
+        if pct == self._last_zoom_pct:
+            return
+        self._last_zoom_pct = pct
+        self._status_zoom.setText(f"Zoom: {pct}%")
 
     def _update_count(self):
-        self._status_count.setText(f"Balloons: {len(self._balloons)}")
+        """Schedule a balloon-count refresh; many calls in one turn share it."""
+        if not self._count_dirty:
+            self._count_dirty = True
+            QTimer.singleShot(0, self._flush_count)
+
+    def _flush_count(self):
+        self._count_dirty = False
+        count = len(self._balloons)
+        if count == self._last_count:
+            return
+        self._last_count = count
+        self._status_count.setText(f"Balloons: {count}")
+
+    def closeEvent(self, event):
+        self._viewer.close_document()
+        super().closeEvent(event)
@@ -1,11 +1,13 @@
 """PDF canvas: QGraphicsView that renders PDF pages and handles balloon placement."""
 from __future__ import annotations
 
+import os
+from collections import OrderedDict
 from enum import Enum, auto
 from typing import Optional
 
 import fitz  # PyMuPDF
-from PyQt6.QtCore import pyqtSignal, Qt, QPointF, QRectF
+from PyQt6.QtCore import pyqtSignal, Qt, QPointF, QRectF, QTimer
 from PyQt6.QtGui import QImage, QMouseEvent, QPainter, QPixmap, QTransform, QWheelEvent, QKeyEvent
 from PyQt6.QtWidgets import (
     QGraphicsView, QGraphicsScene, QGraphicsPixmapItem,
@@ -23,6 +25,21 @@ class ViewMode(Enum):
 
 _BASE_DPI        = 150
 _POINTS_PER_INCH = 72.0
+_MAX_DPI         = 300    # zoomed-in renders step up to this resolution
+_PAGE_CACHE_SIZE = 8      # rendered pages kept for quick revisits ...
+_PAGE_CACHE_BYTES = 256 * 1024 * 1024   # ... within this pixmap budget
+_PREFETCH_DELAY_MS = 120  # idle time after a page flip before neighbours render
+_RERENDER_DELAY_MS = 150  # zoom must settle this long before a re-render
+_WHEEL_ZOOM_SYNC_MS = 16  # wheel-zoom item/label sync, at most once a frame
+
+# Draw the view through OpenGL.  Opt-in: GL drivers under VMs and remote
+# desktop are too often broken to make it the default.
+OPENGL_VIEWPORT = os.environ.get("BALLOONER_OPENGL", "") == "1"
+_STORE_SHRINK_EVERY = 16  # rasterizations between trims of MuPDF's store
+
+
+def _pixmap_bytes(pix: QPixmap) -> int:
+    return pix.width() * pix.height() * pix.depth() // 8
 
 
 class PDFViewer(QGraphicsView):
@@ -33,6 +50,7 @@ class PDFViewer(QGraphicsView):
     balloon_requested    = pyqtSignal(QPointF, int)   # pdf_point, page_index
     balloon_moved        = pyqtSignal(str, QPointF, QPointF)  # uid, center(pdf), target(pdf)
     balloon_deleted      = pyqtSignal(str)
+    balloons_deleted     = pyqtSignal(list)           # uids, one Delete keypress
     balloon_desc_changed = pyqtSignal(str, str)
     balloon_num_changed  = pyqtSignal(str, int)
     page_changed         = pyqtSignal(int, int)       # current, total
@@ -42,11 +60,17 @@ class PDFViewer(QGraphicsView):
         super().__init__(parent)
         self._scene = QGraphicsScene(self)
         self.setScene(self._scene)
-
-        self.setRenderHints(
-            QPainter.RenderHint.Antialiasing |
-            QPainter.RenderHint.SmoothPixmapTransform
-        )
+        if OPENGL_VIEWPORT:
+            self._use_opengl_viewport()
+
+        # No view-wide Antialiasing: the page is a raster, and BalloonItem.paint
+        # turns AA on for its own vector work.
+        self.setRenderHints(QPainter.RenderHint.SmoothPixmapTransform)
+        # One page pixmap plus a few dozen balloons: repainting the whole
+        # viewport is cheaper than tracking per-item damage rects.  Items set
+        # every pen/brush/font they use, so the painter need not be saved.
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
         self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
         self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
@@ -63,21 +87,75 @@ class PDFViewer(QGraphicsView):
 
         self._balloon_items: dict[str, BalloonItem] = {}
         self._all_balloons: dict[str, BalloonData] = {}
-
-        self._pixmap_item: Optional[QGraphicsPixmapItem] = None
+        # Same balloons bucketed by page, so rendering a page only visits its own
+        self._by_page: dict[int, dict[str, BalloonData]] = {}
+
+        # One page item for the viewer's lifetime; page flips swap its pixmap.
+        # It overrides the view's SmoothPixmapTransform hint with its own
+        # mode.  No item cache: a viewport-sized page pixmap would not fit
+        # QPixmapCache's default 10 MB, and the page is already rendered
+        # near screen resolution (_target_dpi).
+        self._pixmap_item = QGraphicsPixmapItem()
+        self._pixmap_item.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
+        # (page, rotation, dpi) -> (pixmap, scene width, scene height,
+        # page height), LRU
+        self._page_cache: OrderedDict[tuple[int, int, int],
+                                      tuple[QPixmap, float, float, float]] = OrderedDict()
+        self._page_cache_bytes = 0
+        self._renders_since_shrink = 0
+        self._shown_dpi = _BASE_DPI
+        # (page, rotation, dpi) currently in the scene
+        self._last_rendered: Optional[tuple[int, int, int]] = None
+        # Zooming scales the current pixmap at once; a sharper one is swapped
+        # in once the zoom has settled.
+        self._rerender_timer = QTimer(self)
+        self._rerender_timer.setSingleShot(True)
+        self._rerender_timer.setInterval(_RERENDER_DELAY_MS)
+        self._rerender_timer.timeout.connect(self._rerender_for_zoom)
+        # Wheel ticks retransform the view at once; rescaling balloons and
+        # emitting zoom_changed is batched per frame.
+        self._wheel_zoom_timer = QTimer(self)
+        self._wheel_zoom_timer.setSingleShot(True)
+        self._wheel_zoom_timer.setInterval(_WHEEL_ZOOM_SYNC_MS)
+        self._wheel_zoom_timer.timeout.connect(self._finish_zoom)
+        # Neighbouring pages rendered into the cache one per idle tick.  This
+        # stays on the GUI thread: MuPDF's context is not thread-safe.
+        self._prefetch_queue: list[int] = []
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(_PREFETCH_DELAY_MS)
+        self._prefetch_timer.timeout.connect(self._prefetch_next)
 
         # Middle-mouse-button panning state
         self._mid_pan_active = False
         self._mid_pan_last: Optional[QPointF] = None
+        # The view owns its scrollbars for life; skip the lookup per move event
+        self._hscroll = self.horizontalScrollBar()
+        self._vscroll = self.verticalScrollBar()
+
+    def _use_opengl_viewport(self):
+        try:
+            from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+        except ImportError:
+            return   # Qt build without OpenGL widgets: stay on the raster path
+        self.setViewport(QOpenGLWidget())
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def load_pdf(self, path: str):
-        self._doc = fitz.open(path)
+        doc = fitz.open(path)
+        if self._doc is not None:
+            self._doc.close()
+        self._doc = doc
         self._pdf_path = path
+        self._page_cache.clear()
+        self._page_cache_bytes = 0
+        self._last_rendered = None
+        self._prefetch_queue.clear()
         self._all_balloons.clear()
+        self._by_page.clear()
         self._page_rotations.clear()
         self._current_page = 0
         self._zoom = 1.0
@@ -85,6 +163,19 @@ class PDFViewer(QGraphicsView):
         self.page_changed.emit(self._current_page, len(self._doc))
         self.zoom_changed.emit(self._zoom)
 
+    def close_document(self):
+        """Release the open document and everything rendered from it."""
+        self._prefetch_timer.stop()
+        self._rerender_timer.stop()
+        self._prefetch_queue.clear()
+        self._page_cache.clear()
+        self._page_cache_bytes = 0
+        self._last_rendered = None
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+        fitz.TOOLS.store_shrink(100)
+
     def rotate_page_cw(self):
         self._rotate_current(90)
 
@@ -100,6 +191,8 @@ class PDFViewer(QGraphicsView):
         if self._doc is None:
             return
         idx = max(0, min(idx, len(self._doc) - 1))
+        if idx == self._current_page and self._last_rendered is not None:
+            return
         self._current_page = idx
         self._render_page(idx)
         self.page_changed.emit(self._current_page, len(self._doc))
@@ -143,20 +236,18 @@ class PDFViewer(QGraphicsView):
         self._apply_zoom(self._zoom / 1.25)
 
     def fit_to_page(self):
-        if self._pixmap_item is None:
+        if self._last_rendered is None:
             return
         self.fitInView(self._pixmap_item, Qt.AspectRatioMode.KeepAspectRatio)
-        rect = self._pixmap_item.boundingRect()
-        view_rect = self.viewport().rect()
-        scale_x = view_rect.width()  / rect.width()  if rect.width()  else 1
-        scale_y = view_rect.height() / rect.height() if rect.height() else 1
-        self._zoom = min(scale_x, scale_y)
-        self.zoom_changed.emit(self._zoom)
+        self._zoom = self.transform().m11()   # the scale fitInView settled on
+        self._rerender_timer.start()
+        self._wheel_zoom_timer.stop()
+        self._finish_zoom()
 
     def fit_to_width(self):
-        if self._pixmap_item is None:
+        if self._last_rendered is None:
             return
-        rect = self._pixmap_item.boundingRect()
+        rect = self._scene.sceneRect()   # page size in points
         view_rect = self.viewport().rect()
         scale = view_rect.width() / rect.width() if rect.width() else 1
         self._apply_zoom(scale)
@@ -165,25 +256,51 @@ class PDFViewer(QGraphicsView):
 
     def add_balloon(self, data: BalloonData):
         self._all_balloons[data.uid] = data
+        self._by_page.setdefault(data.page, {})[data.uid] = data
         if data.page == self._current_page:
             self._add_item(data)
 
+    def add_balloons(self, datas):
+        """Bulk add_balloon: items for the current page, one repaint."""
+        self.setUpdatesEnabled(False)
+        try:
+            for data in datas:
+                self.add_balloon(data)
+        finally:
+            self.setUpdatesEnabled(True)
+
     def remove_balloon(self, uid: str):
-        self._all_balloons.pop(uid, None)
+        data = self._all_balloons.pop(uid, None)
+        if data is not None:
+            self._by_page.get(data.page, {}).pop(uid, None)
         item = self._balloon_items.pop(uid, None)
         if item:
             self._scene.removeItem(item)
 
     def update_balloon(self, data: BalloonData):
+        old = self._all_balloons.get(data.uid)
+        if old is not None and old.page != data.page:
+            self._by_page.get(old.page, {}).pop(data.uid, None)
         self._all_balloons[data.uid] = data
+        self._by_page.setdefault(data.page, {})[data.uid] = data
         item = self._balloon_items.get(data.uid)
         if item:
-            item._data = data
-            item.update()
+            item.set_data(data)
 
     def all_balloons(self) -> list[BalloonData]:
         return list(self._all_balloons.values())
 
+    def balloons_on_page(self, page: int) -> list[BalloonData]:
+        return list(self._by_page.get(page, {}).values())
+
+    def balloon_item(self, uid: str) -> Optional[BalloonItem]:
+        """Scene item for *uid*, or None if it is not on the current page."""
+        return self._balloon_items.get(uid)
+
+    def balloon_items(self):
+        """(uid, item) pairs for the balloons shown on the current page."""
+        return self._balloon_items.items()
+
     def scroll_to_balloon(self, uid: str):
         data = self._all_balloons.get(uid)
         if not data:
@@ -201,52 +318,146 @@ class PDFViewer(QGraphicsView):
             self._scene.removeItem(item)
         self._balloon_items.clear()
         self._all_balloons.clear()
+        self._by_page.clear()
 
     # ------------------------------------------------------------------
     # Internal rendering
     # ------------------------------------------------------------------
 
     def _render_page(self, page_idx: int):
-        for item in self._balloon_items.values():
-            self._scene.removeItem(item)
+        if self._doc is not None and self._last_rendered is not None:
+            state = (page_idx, self._page_rotations.get(page_idx, 0),
+                     self._target_dpi())
+            if state == self._last_rendered:
+                self._reconcile_items(page_idx)
+                return
+
+        # clear() drops every item in one pass; BalloonItem's pending moved
+        # timer only touches Python state, so nothing needs detaching first.
         self._balloon_items.clear()
+        if self._pixmap_item.scene() is not None:
+            self._scene.removeItem(self._pixmap_item)   # survive the clear()
         self._scene.clear()
-        self._pixmap_item = None
+        self._last_rendered = None
 
         if self._doc is None:
             return
 
-        page = self._doc[page_idx]
         rotation = self._page_rotations.get(page_idx, 0)
+        dpi = self._target_dpi()
+        qpix, pt_w, pt_h, self._page_height = self._page_entry(page_idx, rotation, dpi)
+        self._shown_dpi = dpi
+        self._last_rendered = (page_idx, rotation, dpi)
+
+        px_to_pt = pt_w / qpix.width()
+        self._pixmap_item.setPixmap(qpix)
+        self._pixmap_item.setTransform(QTransform.fromScale(px_to_pt, px_to_pt))
+        self._scene.addItem(self._pixmap_item)
+        self._scene.setSceneRect(QRectF(0, 0, pt_w, pt_h))
+
+        self.setTransform(QTransform.fromScale(self._zoom, self._zoom))
+
+        for data in self._by_page.get(page_idx, {}).values():
+            self._add_item(data)
+
+        self._prefetch_queue = [i for i in (page_idx + 1, page_idx - 1)
+                                if 0 <= i < len(self._doc)]
+        self._prefetch_timer.start()
+
+    def _reconcile_items(self, page_idx: int):
+        """Match the scene's balloon items to the page's balloons without
+        touching the pixmap."""
+        wanted = self._by_page.get(page_idx, {})
+        for uid in [u for u in self._balloon_items if u not in wanted]:
+            self._scene.removeItem(self._balloon_items.pop(uid))
+        for uid, data in wanted.items():
+            if uid not in self._balloon_items:
+                self._add_item(data)
 
-        scale = _BASE_DPI / _POINTS_PER_INCH
+    def _target_dpi(self) -> int:
+        """Render resolution for the current zoom: _BASE_DPI, doubled while
+        the screen shows more device pixels per point, up to _MAX_DPI."""
+        needed = _POINTS_PER_INCH * self._device_scale()
+        dpi = _BASE_DPI
+        while dpi < needed and dpi < _MAX_DPI:
+            dpi *= 2
+        return min(dpi, _MAX_DPI)
+
+    def _page_entry(self, page_idx: int, rotation: int,
+                    dpi: int) -> tuple[QPixmap, float, float, float]:
+        """Cached render of a page, rasterizing (and evicting) on a miss."""
+        key = (page_idx, rotation, dpi)
+        cache = self._page_cache
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+            return entry
+        entry = self._rasterize(page_idx, rotation, dpi)
+        cache[key] = entry
+        self._page_cache_bytes += _pixmap_bytes(entry[0])
+        while len(cache) > 1 and (len(cache) > _PAGE_CACHE_SIZE or
+                                  self._page_cache_bytes > _PAGE_CACHE_BYTES):
+            _, old = cache.popitem(last=False)
+            self._page_cache_bytes -= _pixmap_bytes(old[0])
+        return entry
+
+    def _rerender_for_zoom(self):
+        if self._doc is None or self._last_rendered is None:
+            return
+        dpi = self._target_dpi()
+        if dpi == self._shown_dpi:
+            return
+        idx = self._current_page
+        qpix, pt_w, _, _ = self._page_entry(idx, self._page_rotations.get(idx, 0), dpi)
+        # Swap the pixmap only; balloon items (and any drag) stay untouched
+        px_to_pt = pt_w / qpix.width()
+        self._pixmap_item.setPixmap(qpix)
+        self._pixmap_item.setTransform(QTransform.fromScale(px_to_pt, px_to_pt))
+        self._shown_dpi = dpi
+        self._last_rendered = (idx, self._page_rotations.get(idx, 0), dpi)
+
+    def _prefetch_next(self):
+        if self._doc is None:
+            return
+        while self._prefetch_queue:
+            idx = self._prefetch_queue.pop(0)
+            rotation = self._page_rotations.get(idx, 0)
+            if (idx, rotation, self._shown_dpi) not in self._page_cache:
+                self._page_entry(idx, rotation, self._shown_dpi)
+                break
+        if self._prefetch_queue:
+            self._prefetch_timer.start()
+
+    def _rasterize(self, page_idx: int, rotation: int,
+                   dpi: int) -> tuple[QPixmap, float, float, float]:
+        """Render one page with MuPDF; returns the pixmap and its geometry."""
+        page = self._doc[page_idx]
+        scale = dpi / _POINTS_PER_INCH
         mat = fitz.Matrix(scale, scale).prerotate(rotation)
         pix = page.get_pixmap(matrix=mat, alpha=False)
 
         if rotation in (90, 270):
-            self._page_height = page.rect.width
+            page_height = page.rect.width
             pt_w = page.rect.height
             pt_h = page.rect.width
         else:
-            self._page_height = page.rect.height
+            page_height = page.rect.height
             pt_w = page.rect.width
             pt_h = page.rect.height
 
-        img = QImage(pix.samples, pix.width, pix.height,
+        # samples_mv views MuPDF's buffer directly (samples returns a bytes
+        # copy); fromImage makes its own copy while pix is still alive.
+        img = QImage(pix.samples_mv, pix.width, pix.height,
                      pix.stride, QImage.Format.Format_RGB888)
         qpix = QPixmap.fromImage(img)
 
-        self._pixmap_item = QGraphicsPixmapItem(qpix)
-        px_to_pt = pt_w / pix.width
-        self._pixmap_item.setTransform(QTransform().scale(px_to_pt, px_to_pt))
-        self._scene.addItem(self._pixmap_item)
-        self._scene.setSceneRect(QRectF(0, 0, pt_w, pt_h))
-
-        self.setTransform(QTransform().scale(self._zoom, self._zoom))
-
-        for data in self._all_balloons.values():
-            if data.page == page_idx:
-                self._add_item(data)
+        # Pages are cached here as QPixmaps, so MuPDF's own store (fonts,
+        # decoded images) only needs to outlive the current render.
+        self._renders_since_shrink += 1
+        if self._renders_since_shrink >= _STORE_SHRINK_EVERY:
+            self._renders_since_shrink = 0
+            fitz.TOOLS.store_shrink(100)
+        return qpix, pt_w, pt_h, page_height
 
     def _add_item(self, data: BalloonData):
         item = BalloonItem(data, self._page_height)
@@ -254,6 +465,7 @@ class PDFViewer(QGraphicsView):
         item.signals.deleted.connect(self.balloon_deleted)
         item.signals.description_changed.connect(self.balloon_desc_changed)
         item.signals.number_changed.connect(self.balloon_num_changed)
+        item.set_view_scale(self._device_scale())
         self._scene.addItem(item)
         self._balloon_items[data.uid] = item
 
@@ -261,11 +473,30 @@ class PDFViewer(QGraphicsView):
     # Zoom helpers
     # ------------------------------------------------------------------
 
-    def _apply_zoom(self, zoom: float):
+    def _apply_zoom(self, zoom: float, deferred: bool = False):
         zoom = max(0.05, min(zoom, 20.0))
         self._zoom = zoom
-        self.setTransform(QTransform().scale(zoom, zoom))
-        self.zoom_changed.emit(zoom)
+        self.setTransform(QTransform.fromScale(zoom, zoom))
+        self._rerender_timer.start()
+        if deferred:
+            if not self._wheel_zoom_timer.isActive():
+                self._wheel_zoom_timer.start()
+        else:
+            self._wheel_zoom_timer.stop()
+            self._finish_zoom()
+
+    def _finish_zoom(self):
+        self._sync_item_view_scale()
+        self.zoom_changed.emit(self._zoom)
+
+    def _device_scale(self) -> float:
+        """Device pixels per scene point at the current zoom."""
+        return self._zoom * self.devicePixelRatioF()
+
+    def _sync_item_view_scale(self):
+        scale = self._device_scale()
+        for item in self._balloon_items.values():
+            item.set_view_scale(scale)
 
     # ------------------------------------------------------------------
     # Event handlers
@@ -280,7 +511,7 @@ class PDFViewer(QGraphicsView):
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
             delta = event.angleDelta().y()
             factor = 1.15 if delta > 0 else 1 / 1.15
-            self._apply_zoom(self._zoom * factor)
+            self._apply_zoom(self._zoom * factor, deferred=True)
             event.accept()
         else:
             super().wheelEvent(event)
@@ -305,10 +536,10 @@ class PDFViewer(QGraphicsView):
 
     def mouseMoveEvent(self, event: QMouseEvent):
         if self._mid_pan_active and self._mid_pan_last is not None:
-            delta = event.position() - self._mid_pan_last
-            self._mid_pan_last = event.position()
-            hs = self.horizontalScrollBar()
-            vs = self.verticalScrollBar()
+            pos = event.position()
+            delta = pos - self._mid_pan_last
+            self._mid_pan_last = pos
+            hs, vs = self._hscroll, self._vscroll
             hs.setValue(hs.value() - int(delta.x()))
             vs.setValue(vs.value() - int(delta.y()))
             event.accept()
@@ -327,7 +558,8 @@ class PDFViewer(QGraphicsView):
 
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key.Key_Delete:
-            for item in self._scene.selectedItems():
-                if isinstance(item, BalloonItem):
-                    self.balloon_deleted.emit(item.uid)
+            uids = [item.uid for item in self._scene.selectedItems()
+                    if isinstance(item, BalloonItem)]
+            if uids:
+                self.balloons_deleted.emit(uids)
         super().keyPressEvent(event)
@@ -1,12 +1,21 @@
 """Entry point for the PDF Ballooner application."""
 import sys
 
+from PyQt6.QtGui import QSurfaceFormat
 from PyQt6.QtWidgets import QApplication
 
 from app.main_window import MainWindow
+from app.pdf_viewer import OPENGL_VIEWPORT
 
 
 def main():
+    if OPENGL_VIEWPORT:
+        # Must be in place before the QApplication exists
+        fmt = QSurfaceFormat()
+        fmt.setSamples(4)
+        fmt.setSwapInterval(1)
+        QSurfaceFormat.setDefaultFormat(fmt)
+
     app = QApplication(sys.argv)
     app.setApplicationName("PDF Ballooner")
     app.setOrganizationName("PDFBallooner")
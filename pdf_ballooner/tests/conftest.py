@@ -0,0 +1,7 @@
+"""Make the `app` package importable and keep Qt off the display."""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
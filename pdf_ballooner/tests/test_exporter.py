@@ -0,0 +1,41 @@
+"""export_pdf output checks."""
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtCore import QPointF
+
+from app.balloon import BalloonData
+from app.exporter import export_pdf
+
+
+def _label_dirs(path, text: str) -> list[tuple[float, float]]:
+    """Writing direction of every text line on page 0 that reads *text*."""
+    with fitz.open(path) as doc:
+        blocks = doc[0].get_text("dict")["blocks"]
+    return [
+        line["dir"]
+        for block in blocks if block["type"] == 0
+        for line in block["lines"]
+        if "".join(span["text"] for span in line["spans"]).strip() == text
+    ]
+
+
+def test_label_follows_user_rotation_on_page_with_own_rotate(tmp_path):
+    # /Rotate 270 plus a user rotation of 90 leaves the page at 0; the label
+    # must still be turned by the user's 90.
+    src, dst = tmp_path / "src.pdf", tmp_path / "out.pdf"
+    doc = fitz.open()
+    doc.new_page(width=595, height=842).set_rotation(270)
+    doc.save(src)
+    doc.close()
+
+    balloon = BalloonData(number=7, page=0,
+                          target_point=QPointF(200, 300),
+                          balloon_center=QPointF(250, 350))
+    export_pdf(str(src), str(dst), [balloon], page_rotations={0: 90})
+
+    dirs = _label_dirs(dst, "7")
+    assert len(dirs) == 1
+    assert dirs[0] == pytest.approx((0.0, -1.0), abs=1e-6)
@@ -0,0 +1,60 @@
+"""MainWindow balloon bookkeeping."""
+import pytest
+
+pytest.importorskip("fitz")
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtCore import QEvent, QPointF, Qt
+from PyQt6.QtGui import QKeyEvent
+from PyQt6.QtWidgets import QApplication
+
+from app.balloon import BalloonData
+from app.main_window import MainWindow
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(qapp):
+    w = MainWindow()
+    yield w
+    w.close()
+
+
+def _add_balloons(window, numbers) -> list[BalloonData]:
+    datas = [BalloonData(number=n, page=0,
+                         target_point=QPointF(100 * n, 100),
+                         balloon_center=QPointF(100 * n + 40, 140))
+             for n in numbers]
+    window._do_add_balloons(datas)
+    return datas
+
+
+def test_renumbering_a_balloon_frees_its_old_number(window):
+    datas = _add_balloons(window, (1, 2, 3))
+
+    # Same route as the item's "Edit number" menu: item -> viewer -> window
+    uid = datas[1].uid
+    window._viewer.balloon_item(uid).signals.number_changed.emit(uid, 10)
+
+    assert datas[1].number == 10
+    assert window._viewer.balloon_item(uid).data.number == 10
+    assert window._next_free_number() == 2
+
+
+def test_deleting_a_selection_is_one_undo_step(window):
+    datas = _add_balloons(window, (1, 2, 3))
+    for _, item in window._viewer.balloon_items():
+        item.setSelected(True)
+
+    window._viewer.keyPressEvent(QKeyEvent(
+        QEvent.Type.KeyPress, Qt.Key.Key_Delete, Qt.KeyboardModifier.NoModifier))
+    assert not window._balloons
+    assert window._undo_stack.count() == 1
+
+    window._undo_stack.undo()
+    assert set(window._balloons) == {d.uid for d in datas}
+    assert len(window._viewer.balloon_items()) == 3